@@ -1,6 +1,22 @@
 -- Sistema de Gestão Integrada de TI
 -- Esquema do Banco de Dados PostgreSQL
 
+-- Extensões da busca global (/api/busca)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Chaves normalizadas da busca (unaccent não é IMMUTABLE, por isso o
+-- dicionário é informado explicitamente para poder ser usado em índices)
+CREATE OR REPLACE FUNCTION normalizar_texto(valor TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(public.unaccent('public.unaccent'::regdictionary, valor));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+CREATE OR REPLACE FUNCTION somente_digitos(valor TEXT)
+RETURNS TEXT AS $$
+    SELECT regexp_replace(valor, '[^0-9]', '', 'g');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
 -- Tabela de Usuários
 CREATE TABLE usuarios (
     id SERIAL PRIMARY KEY,
@@ -110,7 +126,8 @@ CREATE TABLE chamados (
     data_atribuicao TIMESTAMP,
     data_resolucao TIMESTAMP,
     data_fechamento TIMESTAMP,
-    solucao TEXT
+    solucao TEXT,
+    documento_busca TSVECTOR
 );
 
 -- Tabela de Histórico de Chamados
@@ -173,6 +190,55 @@ CREATE TABLE contas_mensais (
     data_pagamento TIMESTAMP
 );
 
+-- Contadores da numeração sequencial (chamados e pedidos de compra)
+CREATE TABLE contadores_numeracao (
+    serie VARCHAR(30) NOT NULL,
+    ano INTEGER NOT NULL,
+    ultimo_numero INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (serie, ano)
+);
+
+-- Versão de cada tabela, incrementada a cada commit que a altera (ETags)
+CREATE TABLE versoes_tabelas (
+    tabela VARCHAR(64) PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0
+);
+
+-- Arquivos enviados, um por conteúdo (UPLOAD_FOLDER/objetos/ab/cd/<sha256>);
+-- referencias conta os campos anexo_* que apontam para cada um
+CREATE TABLE anexos (
+    id SERIAL PRIMARY KEY,
+    sha256 CHAR(64) UNIQUE NOT NULL,
+    tamanho BIGINT NOT NULL,
+    caminho VARCHAR(255) NOT NULL,
+    referencias INTEGER NOT NULL DEFAULT 0,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ultimo_envio TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tokens de recuperação de senha (só o SHA-256 do token é gravado)
+CREATE TABLE tokens_recuperacao (
+    token_hash VARCHAR(64) PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    criado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expira_em TIMESTAMP NOT NULL
+);
+
+-- Caixa de saída de emails, enviada em segundo plano (utils/caixa_saida.py)
+CREATE TABLE emails_pendentes (
+    id SERIAL PRIMARY KEY,
+    destinatario VARCHAR(255) NOT NULL,
+    assunto VARCHAR(255) NOT NULL,
+    corpo_texto TEXT NOT NULL,
+    corpo_html TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_erro TEXT,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    data_envio TIMESTAMP
+);
+
 -- Índices para melhor performance
 CREATE INDEX idx_usuarios_email ON usuarios(email);
 CREATE INDEX idx_compras_status ON compras(status);
@@ -186,6 +252,39 @@ CREATE INDEX idx_inventario_tipo ON inventario(tipo_item);
 CREATE INDEX idx_contas_vencimento ON contas_mensais(data_vencimento);
 CREATE INDEX idx_contas_status ON contas_mensais(status_pagamento);
 
+-- Índices para paginação por cursor (keyset) nas listagens
+CREATE INDEX idx_chamados_keyset ON chamados(data_abertura DESC NULLS LAST, id DESC);
+CREATE INDEX idx_compras_keyset ON compras(data_solicitacao DESC NULLS LAST, id DESC);
+CREATE INDEX idx_ativos_keyset ON ativos(data_aquisicao DESC NULLS LAST, id DESC);
+CREATE INDEX idx_inventario_keyset ON inventario(nome, id);
+
+-- Índice parcial para itens com estoque baixo (Inventario.estoque_baixo)
+CREATE INDEX idx_inventario_estoque_baixo ON inventario(nome, id)
+    WHERE quantidade_minima IS NOT NULL AND quantidade <= quantidade_minima;
+
+-- Índices trigram da busca global (mesmas expressões de utils/busca_global.py)
+CREATE INDEX idx_fornecedores_nome_trgm ON fornecedores USING GIN (normalizar_texto(nome) gin_trgm_ops);
+CREATE INDEX idx_fornecedores_cnpj_trgm ON fornecedores USING GIN (somente_digitos(cnpj) gin_trgm_ops);
+CREATE INDEX idx_ativos_nome_trgm ON ativos USING GIN (normalizar_texto(nome) gin_trgm_ops);
+CREATE INDEX idx_ativos_numero_serie_trgm ON ativos USING GIN (normalizar_texto(numero_serie) gin_trgm_ops);
+CREATE INDEX idx_usuarios_nome_trgm ON usuarios USING GIN (normalizar_texto(nome) gin_trgm_ops);
+CREATE INDEX idx_usuarios_email_trgm ON usuarios USING GIN (normalizar_texto(email) gin_trgm_ops);
+CREATE INDEX idx_compras_numero_pedido_trgm ON compras USING GIN (normalizar_texto(numero_pedido) gin_trgm_ops);
+
+-- Limpeza dos tokens expirados (`flask limpar-tokens-recuperacao`)
+CREATE INDEX idx_tokens_recuperacao_expira_em ON tokens_recuperacao(expira_em);
+
+-- Anexos sem uso (`flask limpar-anexos`)
+CREATE INDEX idx_anexos_orfaos ON anexos(ultimo_envio) WHERE referencias <= 0;
+
+-- Emails a enviar (o entregador só procura os pendentes vencidos)
+CREATE INDEX idx_emails_pendentes_proxima ON emails_pendentes(proxima_tentativa, id)
+    WHERE status = 'pendente';
+
+-- Busca textual nos chamados (/api/chamados/busca); documento_busca é
+-- mantido pela aplicação (utils/busca_chamados.py)
+CREATE INDEX idx_chamados_documento_busca ON chamados USING GIN (documento_busca);
+
 -- Triggers para atualização automática de timestamps
 CREATE OR REPLACE FUNCTION update_timestamp()
 RETURNS TRIGGER AS $$
@@ -200,10 +299,23 @@ CREATE TRIGGER trigger_usuarios_update
     FOR EACH ROW
     EXECUTE FUNCTION update_timestamp();
 
+-- Nos ativos o recálculo diário da depreciação (só valor_atual muda) não
+-- conta como edição
+CREATE OR REPLACE FUNCTION update_timestamp_ativos()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (to_jsonb(NEW) - 'valor_atual' - 'data_atualizacao')
+            IS DISTINCT FROM (to_jsonb(OLD) - 'valor_atual' - 'data_atualizacao') THEN
+        NEW.data_atualizacao = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE TRIGGER trigger_ativos_update
     BEFORE UPDATE ON ativos
     FOR EACH ROW
-    EXECUTE FUNCTION update_timestamp();
+    EXECUTE FUNCTION update_timestamp_ativos();
 
 CREATE TRIGGER trigger_inventario_update
     BEFORE UPDATE ON inventario
@@ -222,6 +334,9 @@ DECLARE
     valor_depreciado DECIMAL;
 BEGIN
     anos_decorridos := EXTRACT(YEAR FROM AGE(CURRENT_DATE, data_aquisicao));
+    IF anos_decorridos <= 0 THEN
+        RETURN valor_aquisicao;
+    END IF;
     valor_depreciado := valor_aquisicao * (percentual_depreciacao / 100) * anos_decorridos;
     
     IF valor_depreciado > valor_aquisicao THEN
@@ -233,6 +348,7 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Trigger para atualizar valor atual dos ativos automaticamente
+-- (a passagem dos anos é aplicada pelo comando diário `flask recalcular-depreciacao`)
 CREATE OR REPLACE FUNCTION atualizar_valor_ativo()
 RETURNS TRIGGER AS $$
 BEGIN
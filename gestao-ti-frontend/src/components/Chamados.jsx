@@ -14,7 +14,7 @@ export function Chamados() {
 
   const carregarChamados = async () => {
     try {
-      const response = await fetch('/api/chamados')
+      const response = await fetch('/api/chamados?fields=id,numero_chamado,titulo,status,prioridade,data_abertura&expand=solicitante')
       if (response.ok) {
         const data = await response.json()
         setChamados(data)
@@ -14,7 +14,7 @@ export function Compras() {
 
   const carregarCompras = async () => {
     try {
-      const response = await fetch('/api/compras')
+      const response = await fetch('/api/compras?fields=id,numero_pedido,descricao,status,valor_total,data_solicitacao&expand=fornecedor')
       if (response.ok) {
         const data = await response.json()
         setCompras(data)
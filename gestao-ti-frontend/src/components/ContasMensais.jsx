@@ -14,7 +14,7 @@ export function ContasMensais() {
 
   const carregarContas = async () => {
     try {
-      const response = await fetch('/api/contas-mensais')
+      const response = await fetch('/api/contas-mensais?fields=id,tipo_conta,descricao,valor,data_vencimento,status_pagamento,recorrencia&expand=fornecedor')
       if (response.ok) {
         const data = await response.json()
         setContas(data)
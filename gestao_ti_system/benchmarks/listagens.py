@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Compara o custo das listagens completas de compras e chamados.
+
+Mede o caminho antigo (objetos do ORM com o perfil de carregamento +
+to_dict()) e o caminho por colunas (LeituraColunas), ambos serializados
+para JSON como em listar_compras/listar_chamados: tempo (melhor de N
+execuções) e pico de memória alocada (tracemalloc).
+
+    python benchmarks/listagens.py --registros 5000 --repeticoes 5
+
+Por padrão usa SQLite em memória. BENCHMARK_DATABASE_URL aponta para
+outro banco (ex.: um PostgreSQL de testes); os dados gerados ficam em
+uma transação que é desfeita ao final.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from src.models.user import db, Usuario
+from src.models.centro_custo import CentroCusto
+from src.models.fornecedor import Fornecedor
+from src.models.compra import Compra
+from src.models.chamado import Chamado
+from src.utils.campos import LEITURAS_COLUNAS
+from src.utils.carregamento import com_perfil
+from src.utils.json_rapido import ProvedorJson
+
+
+@compiles(TSVECTOR, 'sqlite')
+def _tsvector_sqlite(tipo, compilador, **kwargs):
+    return 'TEXT'
+
+
+def popular(total):
+    usuarios = [
+        Usuario(nome=f'Usuário {i}', email=f'benchmark{i}@empresa.com', senha='x', perfil='tecnico')
+        for i in range(50)
+    ]
+    centros = [CentroCusto(codigo=f'BENCH{i}', nome=f'Centro {i}') for i in range(20)]
+    fornecedores = [Fornecedor(nome=f'Fornecedor {i}', cnpj=f'{i:014d}') for i in range(100)]
+    db.session.add_all(usuarios + centros + fornecedores)
+    db.session.flush()
+
+    inicio = datetime(2024, 1, 1)
+    compras = []
+    chamados = []
+    for i in range(total):
+        compras.append({
+            'fornecedor_id': fornecedores[i % len(fornecedores)].id,
+            'centro_custo_id': centros[i % len(centros)].id,
+            'usuario_solicitante_id': usuarios[i % len(usuarios)].id,
+            'numero_pedido': f'BENCH-{i:08d}',
+            'descricao': f'Compra de teste {i}',
+            'valor_total': 100 + i % 900,
+            'status': 'solicitado',
+            'data_solicitacao': inicio + timedelta(minutes=i),
+            'observacoes': 'Gerada pelo benchmark de listagens'
+        })
+        chamados.append({
+            'numero_chamado': f'BENCH-{i:08d}',
+            'titulo': f'Chamado de teste {i}',
+            'descricao': 'Descrição do problema relatado pelo usuário',
+            'solicitante_id': usuarios[i % len(usuarios)].id,
+            'tecnico_atribuido_id': usuarios[(i + 1) % len(usuarios)].id if i % 3 else None,
+            'prioridade': 'media',
+            'status': 'aberto',
+            'categoria': 'hardware',
+            'data_abertura': inicio + timedelta(minutes=i)
+        })
+    db.session.execute(Compra.__table__.insert(), compras)
+    db.session.execute(Chamado.__table__.insert(), chamados)
+
+
+def listar_orm(modelo, nome_recurso, ordem):
+    query = com_perfil(modelo.query, f'{nome_recurso}_lista')
+    return [objeto.to_dict() for objeto in query.order_by(ordem.desc()).all()]
+
+
+def listar_colunas(modelo, nome_recurso, ordem):
+    leitura = LEITURAS_COLUNAS[nome_recurso]
+    serializar = leitura.serializador()
+    return [serializar(linha) for linha in leitura.aplicar(modelo.query).order_by(ordem.desc()).all()]
+
+
+def medir(app, funcao, args, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        gc.collect()
+        inicio = time.perf_counter()
+        corpo = app.json.dumps(funcao(*args))
+        tempos.append(time.perf_counter() - inicio)
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    app.json.dumps(funcao(*args))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico, len(corpo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--registros', type=int, default=5000, help='Compras e chamados gerados')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por caminho (vale a melhor)')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('BENCHMARK_DATABASE_URL', 'sqlite://')
+    app.json = ProvedorJson(app)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        try:
+            popular(args.registros)
+            print(f'{args.registros} registros por tabela, melhor de {args.repeticoes} execuções')
+            print(f'{"listagem":<17}{"caminho":<10}{"tempo (ms)":>12}{"pico (MiB)":>12}{"JSON (KiB)":>12}')
+            for nome, modelo, recurso, ordem in (
+                ('listar_compras', Compra, 'compra', Compra.data_solicitacao),
+                ('listar_chamados', Chamado, 'chamado', Chamado.data_abertura),
+            ):
+                resultados = {}
+                for caminho, funcao in (('orm', listar_orm), ('colunas', listar_colunas)):
+                    tempo, pico, tamanho = medir(app, funcao, (modelo, recurso, ordem), args.repeticoes)
+                    resultados[caminho] = (tempo, pico)
+                    print(f'{nome:<17}{caminho:<10}{tempo * 1000:>12.1f}{pico / 2 ** 20:>12.1f}{tamanho / 1024:>12.0f}')
+                tempo_orm, pico_orm = resultados['orm']
+                tempo_colunas, pico_colunas = resultados['colunas']
+                print(f'{"":<17}{"ganho":<10}{tempo_orm / tempo_colunas:>11.1f}x{pico_orm / pico_colunas:>11.1f}x')
+        finally:
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+from src.utils.pool import PoolMonitorado
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'asdf#FGSgvasgf$5$WGT'
@@ -10,10 +11,106 @@ class Config:
     DB_USER = os.environ.get('DB_USER') or 'gestao_app'
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or 'gestao123'
     
-    SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    SQLALCHEMY_DATABASE_URI = (
+        os.environ.get('DATABASE_URL')
+        or f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Pool de conexões, por processo (cada worker do gunicorn tem o seu).
+    # pre_ping descarta conexões mortas (ex.: após failover do PostgreSQL)
+    # antes de entregá-las; recycle renova conexões antigas; keepalives TCP
+    # detectam o servidor que sumiu sem fechar a conexão. Compatível com
+    # PgBouncer em modo transaction: os parâmetros por requisição são SET
+    # LOCAL (valem só para a transação).
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') != '0'
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT') or 5)
+    
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+    if SQLALCHEMY_DATABASE_URI.startswith('postgresql'):
+        # Opções de QueuePool: o SQLite (ex.: DATABASE_URL=sqlite:// nos
+        # testes) usa outro pool, que não as aceita
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'poolclass': PoolMonitorado,
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            # LIFO reaproveita as conexões mais recentes; as excedentes ficam
+            # ociosas e são encerradas pelo recycle
+            'pool_use_lifo': True,
+            'connect_args': {
+                'connect_timeout': DB_CONNECT_TIMEOUT,
+                'application_name': os.environ.get('DB_APPLICATION_NAME') or 'gestao_ti',
+                'keepalives': 1,
+                'keepalives_idle': 30,
+                'keepalives_interval': 10,
+                'keepalives_count': 3,
+            },
+        })
+    
+    # Réplicas de leitura (URLs separadas por vírgula): viram as binds
+    # replica_1, replica_2... e recebem as leituras das requisições GET
+    # (utils/replicas.py). Réplicas com atraso acima do máximo (s) são
+    # ignoradas; após uma escrita o cliente lê do primário por alguns segundos.
+    SQLALCHEMY_BINDS = {
+        f'replica_{indice}': url.strip()
+        for indice, url in enumerate((os.environ.get('DB_REPLICA_URLS') or '').split(','), start=1)
+        if url.strip()
+    }
+    DB_REPLICA_ATRASO_MAXIMO = float(os.environ.get('DB_REPLICA_ATRASO_MAXIMO') or 5)
+    DB_REPLICA_INTERVALO_VERIFICACAO = float(os.environ.get('DB_REPLICA_INTERVALO_VERIFICACAO') or 5)
+    DB_LEITURA_PRIMARIO_APOS_ESCRITA = int(os.environ.get('DB_LEITURA_PRIMARIO_APOS_ESCRITA') or 10)
+    
+    # statement_timeout (ms) aplicado a cada transação das requisições; 0
+    # mantém o padrão do servidor. Blueprints podem ter limite próprio.
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT') or 30000)
+    DB_STATEMENT_TIMEOUT_BLUEPRINTS = {
+        # autocomplete: melhor falhar rápido do que segurar a conexão
+        'busca': int(os.environ.get('DB_STATEMENT_TIMEOUT_BUSCA') or 3000),
+        'dashboard': int(os.environ.get('DB_STATEMENT_TIMEOUT_DASHBOARD') or 10000),
+    }
+    
+    # Caixa de saída de emails (utils/caixa_saida.py): tamanho do lote,
+    # intervalo entre verificações (s), tentativas e espera base (s) entre elas
+    EMAIL_LOTE = int(os.environ.get('EMAIL_LOTE') or 20)
+    EMAIL_INTERVALO = float(os.environ.get('EMAIL_INTERVALO') or 5)
+    EMAIL_MAX_TENTATIVAS = int(os.environ.get('EMAIL_MAX_TENTATIVAS') or 6)
+    EMAIL_ATRASO_BASE = int(os.environ.get('EMAIL_ATRASO_BASE') or 30)
+    # 0 quando o entregador roda em processo próprio (`flask enviar-emails`)
+    EMAIL_ENTREGADOR_EMBUTIDO = os.environ.get('EMAIL_ENTREGADOR_EMBUTIDO', '1') == '1'
+    
+    # Verificação da conexão SMTP em segundo plano (utils/saude_smtp.py):
+    # intervalo entre verificações e timeout de cada uma (s)
+    SMTP_INTERVALO_VERIFICACAO = float(os.environ.get('SMTP_INTERVALO_VERIFICACAO') or 300)
+    SMTP_TIMEOUT_VERIFICACAO = float(os.environ.get('SMTP_TIMEOUT_VERIFICACAO') or 5)
+    
+    # Onde ficam os tokens de recuperação de senha: 'banco' (tabela
+    # tokens_recuperacao) ou 'memoria' (testes, um único processo)
+    TOKENS_RECUPERACAO_ARMAZENAMENTO = os.environ.get('TOKENS_RECUPERACAO_ARMAZENAMENTO') or 'banco'
+    
+    # Orçamento de consultas SQL por requisição (0 desativa; usado em testes)
+    ORCAMENTO_CONSULTAS = int(os.environ.get('ORCAMENTO_CONSULTAS') or 0)
+    # Limites por endpoint, no formato "endpoint=n,endpoint=n"
+    # (ex.: "compra.listar_compras=3,chamado.obter_chamado=4")
+    ORCAMENTO_CONSULTAS_ENDPOINTS = {
+        endpoint.strip(): int(limite)
+        for endpoint, _, limite in (
+            item.partition('=') for item in (os.environ.get('ORCAMENTO_CONSULTAS_ENDPOINTS') or '').split(',')
+        )
+        if endpoint.strip() and limite.strip()
+    }
+    
     # Configurações de upload
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    # Anexos sem referência são apagados por `flask limpar-anexos` depois de
+    # tantas horas do último envio (tempo para o upload ser vinculado)
+    ANEXOS_ORFAOS_HORAS = int(os.environ.get('ANEXOS_ORFAOS_HORAS') or 24)
 
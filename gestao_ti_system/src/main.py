@@ -17,6 +17,11 @@ from src.models.ativo import Ativo
 from src.models.chamado import Chamado, HistoricoChamado
 from src.models.inventario import Inventario, MovimentacaoInventario
 from src.models.conta_mensal import ContaMensal
+from src.models.contador_numeracao import ContadorNumeracao
+from src.models.versao_tabela import VersaoTabela
+from src.models.email_pendente import EmailPendente
+from src.models.token_recuperacao import TokenRecuperacao
+from src.models.anexo import Anexo
 
 # Importar blueprints
 from src.routes.user import user_bp
@@ -31,9 +36,24 @@ from src.routes.upload import upload_bp
 from src.routes.dashboard import dashboard_bp
 from src.routes.configuracoes import configuracoes_bp
 from src.routes.recuperacao_senha import recuperacao_bp
+from src.routes.busca import busca_bp
+from src.routes.saude import saude_bp
+from src.utils.anexos import registrar_anexos
+from src.utils.busca_chamados import registrar_reindexacao_busca
+from src.utils.caixa_saida import registrar_caixa_saida
+from src.utils.carregamento import registrar_orcamento_consultas
+from src.utils.depreciacao import registrar_recalculo_depreciacao
+from src.utils.duplicados import registrar_agrupamento_duplicados
+from src.utils.json_rapido import ProvedorJson
+from src.utils.replicas import registrar_replicas
+from src.utils.saude_smtp import registrar_monitor_smtp
+from src.utils.sessao import registrar_politicas_sessao
+from src.utils.tokens_recuperacao import registrar_limpeza_tokens
+from src.utils.versoes import registrar_versionamento
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config.from_object(Config)
+app.json = ProvedorJson(app)
 
 # Habilitar CORS para todas as rotas
 CORS(app)
@@ -54,9 +74,22 @@ app.register_blueprint(upload_bp, url_prefix='/api')
 app.register_blueprint(dashboard_bp, url_prefix='/api')
 app.register_blueprint(configuracoes_bp, url_prefix='/api/configuracoes')
 app.register_blueprint(recuperacao_bp, url_prefix='/api')
+app.register_blueprint(busca_bp, url_prefix='/api')
+app.register_blueprint(saude_bp, url_prefix='/api')
 
 # Configuração do banco de dados PostgreSQL
 db.init_app(app)
+registrar_orcamento_consultas(app)
+registrar_versionamento(app)
+registrar_politicas_sessao(app)
+registrar_replicas(app)
+registrar_recalculo_depreciacao(app)
+registrar_reindexacao_busca(app)
+registrar_agrupamento_duplicados(app)
+registrar_caixa_saida(app)
+registrar_monitor_smtp(app)
+registrar_limpeza_tokens(app)
+registrar_anexos(app)
 with app.app_context():
     db.create_all()
 
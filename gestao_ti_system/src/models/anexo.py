@@ -0,0 +1,22 @@
+from datetime import datetime
+from src.models.user import db
+
+class Anexo(db.Model):
+    """Arquivo enviado, guardado uma única vez por conteúdo (SHA-256).
+
+    ``referencias`` conta quantos campos anexo_* apontam para ele (mantido
+    por utils/anexos.py); os sem referência são apagados por
+    ``flask limpar-anexos``.
+    """
+    __tablename__ = 'anexos'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    tamanho = db.Column(db.BigInteger, nullable=False)
+    caminho = db.Column(db.String(255), nullable=False)  # relativo a UPLOAD_FOLDER
+    referencias = db.Column(db.Integer, nullable=False, default=0)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    ultimo_envio = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Anexo {self.sha256[:12]} ({self.referencias} referências)>'
@@ -30,7 +30,11 @@ class Ativo(db.Model):
         return f'<Ativo {self.nome}>'
 
     def calcular_depreciacao(self):
-        """Calcula a depreciação automática do ativo"""
+        """Calcula a depreciação automática do ativo.
+
+        Usado na gravação e pelo recálculo diário para manter a coluna
+        valor_atual; as leituras usam o valor persistido.
+        """
         if not self.valor_aquisicao or not self.data_aquisicao:
             return self.valor_aquisicao or 0
         
@@ -57,14 +61,14 @@ class Ativo(db.Model):
             'localizacao': self.localizacao,
             'responsavel_id': self.responsavel_id,
             'centro_custo_id': self.centro_custo_id,
-            'data_aquisicao': self.data_aquisicao.isoformat() if self.data_aquisicao else None,
-            'valor_aquisicao': float(self.valor_aquisicao) if self.valor_aquisicao else None,
-            'valor_atual': self.calcular_depreciacao(),
-            'percentual_depreciacao': float(self.percentual_depreciacao) if self.percentual_depreciacao else None,
-            'data_vencimento_licenca': self.data_vencimento_licenca.isoformat() if self.data_vencimento_licenca else None,
+            'data_aquisicao': self.data_aquisicao,
+            'valor_aquisicao': self.valor_aquisicao,
+            'valor_atual': self.valor_atual,
+            'percentual_depreciacao': self.percentual_depreciacao,
+            'data_vencimento_licenca': self.data_vencimento_licenca,
             'status': self.status,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None,
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao,
             'responsavel': self.responsavel.to_dict() if self.responsavel else None,
             'centro_custo': self.centro_custo.to_dict() if self.centro_custo else None
         }
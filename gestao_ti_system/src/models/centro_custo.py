@@ -21,6 +21,6 @@ class CentroCusto(db.Model):
             'nome': self.nome,
             'descricao': self.descricao,
             'ativo': self.ativo,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None
+            'data_criacao': self.data_criacao
         }
 
@@ -1,4 +1,7 @@
 from src.models.user import db
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from src.utils.numeracao import alocar_numero
 from datetime import datetime
 
 class Chamado(db.Model):
@@ -19,6 +22,8 @@ class Chamado(db.Model):
     data_resolucao = db.Column(db.DateTime)
     data_fechamento = db.Column(db.DateTime)
     solucao = db.Column(db.Text)
+    # Documento da busca textual (mantido por utils.busca_chamados)
+    documento_busca = deferred(db.Column(TSVECTOR))
 
     # Relacionamentos
     solicitante = db.relationship('Usuario', foreign_keys=[solicitante_id], backref='chamados_solicitados')
@@ -30,20 +35,20 @@ class Chamado(db.Model):
 
     def gerar_numero_chamado(self):
         """Gera um número único para o chamado"""
-        hoje = datetime.now()
-        ano = hoje.year
-        # Buscar o último número do ano
+        ano = datetime.now().year
+        novo_numero = alocar_numero('chamado', ano, semente=lambda: Chamado.ultimo_numero_do_ano(ano))
+        return f'{ano}-{novo_numero:06d}'
+
+    @staticmethod
+    def ultimo_numero_do_ano(ano):
+        """Maior número de chamado já usado no ano (semente do contador)"""
         ultimo_chamado = Chamado.query.filter(
-            Chamado.numero_chamado.like(f'{ano}%')
+            Chamado.numero_chamado.like(f'{ano}-%')
         ).order_by(Chamado.numero_chamado.desc()).first()
         
         if ultimo_chamado:
-            ultimo_numero = int(ultimo_chamado.numero_chamado.split('-')[1])
-            novo_numero = ultimo_numero + 1
-        else:
-            novo_numero = 1
-        
-        return f'{ano}-{novo_numero:06d}'
+            return int(ultimo_chamado.numero_chamado.split('-')[1])
+        return 0
 
     def to_dict(self):
         return {
@@ -57,10 +62,10 @@ class Chamado(db.Model):
             'status': self.status,
             'categoria': self.categoria,
             'anexo_evidencia': self.anexo_evidencia,
-            'data_abertura': self.data_abertura.isoformat() if self.data_abertura else None,
-            'data_atribuicao': self.data_atribuicao.isoformat() if self.data_atribuicao else None,
-            'data_resolucao': self.data_resolucao.isoformat() if self.data_resolucao else None,
-            'data_fechamento': self.data_fechamento.isoformat() if self.data_fechamento else None,
+            'data_abertura': self.data_abertura,
+            'data_atribuicao': self.data_atribuicao,
+            'data_resolucao': self.data_resolucao,
+            'data_fechamento': self.data_fechamento,
             'solucao': self.solucao,
             'solicitante': self.solicitante.to_dict() if self.solicitante else None,
             'tecnico_atribuido': self.tecnico_atribuido.to_dict() if self.tecnico_atribuido else None
@@ -93,7 +98,7 @@ class HistoricoChamado(db.Model):
             'descricao': self.descricao,
             'status_anterior': self.status_anterior,
             'status_novo': self.status_novo,
-            'data_acao': self.data_acao.isoformat() if self.data_acao else None,
+            'data_acao': self.data_acao,
             'usuario': self.usuario.to_dict() if self.usuario else None
         }
 
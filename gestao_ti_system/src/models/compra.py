@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.utils.numeracao import alocar_numero
 from datetime import datetime
 
 class Compra(db.Model):
@@ -29,6 +30,23 @@ class Compra(db.Model):
     def __repr__(self):
         return f'<Compra {self.numero_pedido}>'
 
+    def gerar_numero_pedido(self):
+        """Gera um número único para o pedido de compra"""
+        ano = datetime.now().year
+        novo_numero = alocar_numero('pedido_compra', ano, semente=lambda: Compra.ultimo_numero_do_ano(ano))
+        return f'PED{ano}{novo_numero:06d}'
+
+    @staticmethod
+    def ultimo_numero_do_ano(ano):
+        """Maior número de pedido já usado no ano (semente do contador)"""
+        ultimo_pedido = Compra.query.filter(
+            Compra.numero_pedido.like(f'PED{ano}%')
+        ).order_by(Compra.numero_pedido.desc()).first()
+        
+        if ultimo_pedido:
+            return int(ultimo_pedido.numero_pedido.replace(f'PED{ano}', ''))
+        return 0
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -37,10 +55,10 @@ class Compra(db.Model):
             'usuario_solicitante_id': self.usuario_solicitante_id,
             'numero_pedido': self.numero_pedido,
             'descricao': self.descricao,
-            'valor_total': float(self.valor_total) if self.valor_total else None,
+            'valor_total': self.valor_total,
             'status': self.status,
-            'data_solicitacao': self.data_solicitacao.isoformat() if self.data_solicitacao else None,
-            'data_aquisicao': self.data_aquisicao.isoformat() if self.data_aquisicao else None,
+            'data_solicitacao': self.data_solicitacao,
+            'data_aquisicao': self.data_aquisicao,
             'anexo_pedido': self.anexo_pedido,
             'anexo_nota_fiscal': self.anexo_nota_fiscal,
             'anexo_boleto': self.anexo_boleto,
@@ -71,8 +89,8 @@ class ProdutoAdquirido(db.Model):
             'nome': self.nome,
             'descricao': self.descricao,
             'quantidade': self.quantidade,
-            'valor_unitario': float(self.valor_unitario) if self.valor_unitario else None,
-            'valor_total': float(self.valor_total) if self.valor_total else None
+            'valor_unitario': self.valor_unitario,
+            'valor_total': self.valor_total
         }
 
 class RateioCompra(db.Model):
@@ -95,8 +113,8 @@ class RateioCompra(db.Model):
             'id': self.id,
             'compra_id': self.compra_id,
             'centro_custo_id': self.centro_custo_id,
-            'percentual': float(self.percentual) if self.percentual else None,
-            'valor': float(self.valor) if self.valor else None,
+            'percentual': self.percentual,
+            'valor': self.valor,
             'centro_custo': self.centro_custo.to_dict() if self.centro_custo else None
         }
 
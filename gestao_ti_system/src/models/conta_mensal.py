@@ -36,15 +36,15 @@ class ContaMensal(db.Model):
             'tipo_conta': self.tipo_conta,
             'fornecedor_id': self.fornecedor_id,
             'centro_custo_id': self.centro_custo_id,
-            'valor': float(self.valor) if self.valor else None,
-            'data_vencimento': self.data_vencimento.isoformat() if self.data_vencimento else None,
+            'valor': self.valor,
+            'data_vencimento': self.data_vencimento,
             'status_pagamento': self.status_pagamento,
             'recorrencia': self.recorrencia,
-            'data_contratacao': self.data_contratacao.isoformat() if self.data_contratacao else None,
+            'data_contratacao': self.data_contratacao,
             'descricao': self.descricao,
             'anexo_contrato': self.anexo_contrato,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_pagamento': self.data_pagamento.isoformat() if self.data_pagamento else None,
+            'data_criacao': self.data_criacao,
+            'data_pagamento': self.data_pagamento,
             'fornecedor': self.fornecedor.to_dict() if self.fornecedor else None,
             'centro_custo': self.centro_custo.to_dict() if self.centro_custo else None,
             'vencida': self.verificar_vencimento()
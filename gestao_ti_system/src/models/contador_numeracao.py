@@ -0,0 +1,11 @@
+from src.models.user import db
+
+class ContadorNumeracao(db.Model):
+    __tablename__ = 'contadores_numeracao'
+    
+    serie = db.Column(db.String(30), primary_key=True)
+    ano = db.Column(db.Integer, primary_key=True)
+    ultimo_numero = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ContadorNumeracao {self.serie}/{self.ano}: {self.ultimo_numero}>'
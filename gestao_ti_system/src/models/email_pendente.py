@@ -0,0 +1,21 @@
+from datetime import datetime
+from src.models.user import db
+
+class EmailPendente(db.Model):
+    """Email aguardando envio pelo entregador (utils/caixa_saida.py)"""
+    __tablename__ = 'emails_pendentes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    destinatario = db.Column(db.String(255), nullable=False)
+    assunto = db.Column(db.String(255), nullable=False)
+    corpo_texto = db.Column(db.Text, nullable=False)
+    corpo_html = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, enviado, falhou
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_erro = db.Column(db.Text)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    data_envio = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<EmailPendente {self.id} {self.destinatario} ({self.status})>'
@@ -27,6 +27,6 @@ class Fornecedor(db.Model):
             'endereco': self.endereco,
             'contato_responsavel': self.contato_responsavel,
             'ativo': self.ativo,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None
+            'data_criacao': self.data_criacao
         }
 
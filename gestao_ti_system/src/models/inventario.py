@@ -1,5 +1,7 @@
 from src.models.user import db
 from datetime import datetime
+from sqlalchemy import and_
+from sqlalchemy.ext.hybrid import hybrid_property
 
 class Inventario(db.Model):
     __tablename__ = 'inventario'
@@ -27,9 +29,19 @@ class Inventario(db.Model):
     def __repr__(self):
         return f'<Inventario {self.nome}>'
 
+    @hybrid_property
+    def estoque_baixo(self):
+        """Estoque no mínimo ou abaixo dele (também utilizável em filtros SQL)"""
+        return self.quantidade_minima is not None and self.quantidade <= self.quantidade_minima
+
+    @estoque_baixo.expression
+    def estoque_baixo(cls):
+        # Coberto pelo índice parcial idx_inventario_estoque_baixo
+        return and_(cls.quantidade_minima.isnot(None), cls.quantidade <= cls.quantidade_minima)
+
     def verificar_estoque_minimo(self):
         """Verifica se o estoque está abaixo do mínimo"""
-        return self.quantidade <= self.quantidade_minima
+        return self.estoque_baixo
 
     def to_dict(self):
         return {
@@ -42,11 +54,11 @@ class Inventario(db.Model):
             'localizacao': self.localizacao,
             'centro_custo_id': self.centro_custo_id,
             'fornecedor_id': self.fornecedor_id,
-            'valor_unitario': float(self.valor_unitario) if self.valor_unitario else None,
-            'data_vencimento_licenca': self.data_vencimento_licenca.isoformat() if self.data_vencimento_licenca else None,
+            'valor_unitario': self.valor_unitario,
+            'data_vencimento_licenca': self.data_vencimento_licenca,
             'observacoes': self.observacoes,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None,
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao,
             'centro_custo': self.centro_custo.to_dict() if self.centro_custo else None,
             'fornecedor': self.fornecedor.to_dict() if self.fornecedor else None,
             'estoque_baixo': self.verificar_estoque_minimo()
@@ -81,7 +93,7 @@ class MovimentacaoInventario(db.Model):
             'quantidade_anterior': self.quantidade_anterior,
             'quantidade_nova': self.quantidade_nova,
             'motivo': self.motivo,
-            'data_movimentacao': self.data_movimentacao.isoformat() if self.data_movimentacao else None,
+            'data_movimentacao': self.data_movimentacao,
             'usuario': self.usuario.to_dict() if self.usuario else None
         }
 
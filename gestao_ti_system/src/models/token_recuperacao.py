@@ -0,0 +1,14 @@
+from datetime import datetime
+from src.models.user import db
+
+class TokenRecuperacao(db.Model):
+    """Token de recuperação de senha (guardamos só o SHA-256 do token)"""
+    __tablename__ = 'tokens_recuperacao'
+    
+    token_hash = db.Column(db.String(64), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expira_em = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<TokenRecuperacao usuario={self.usuario_id} expira_em={self.expira_em}>'
@@ -1,8 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import bcrypt
+from src.utils.replicas import SessaoRoteada
 
-db = SQLAlchemy()
+# Os objetos continuam válidos após o commit (sem um SELECT por objeto ao
+# acessá-los de novo); rotas de escrita que devolvem o registro usam
+# carregamento.recarregar(). SessaoRoteada envia leituras às réplicas.
+db = SQLAlchemy(session_options={'expire_on_commit': False, 'class_': SessaoRoteada})
 
 class Usuario(db.Model):
     __tablename__ = 'usuarios'
@@ -34,8 +38,8 @@ class Usuario(db.Model):
             'email': self.email,
             'perfil': self.perfil,
             'ativo': self.ativo,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao
         }
 
 # Manter compatibilidade com o template original
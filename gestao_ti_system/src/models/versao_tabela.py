@@ -0,0 +1,10 @@
+from src.models.user import db
+
+class VersaoTabela(db.Model):
+    __tablename__ = 'versoes_tabelas'
+    
+    tabela = db.Column(db.String(64), primary_key=True)
+    versao = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersaoTabela {self.tabela}: {self.versao}>'
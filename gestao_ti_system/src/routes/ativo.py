@@ -1,25 +1,44 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.ativo import Ativo
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import com_perfil, recarregar
+from src.utils.depreciacao import ANOS_PROJECAO_MAXIMO, projetar_depreciacao
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido, paginacao_solicitada, paginar_keyset
+from src.utils.versoes import com_etag
 from datetime import datetime, date
 
 ativo_bp = Blueprint('ativo', __name__)
 
 @ativo_bp.route('/ativos', methods=['GET'])
+@com_etag('ativos', 'usuarios', 'centros_custo')
 def listar_ativos():
     """Lista todos os ativos"""
     try:
         tipo_filter = request.args.get('tipo')
         status_filter = request.args.get('status')
-        query = Ativo.query
+        query, serializar = consulta_listagem(Ativo.query, 'ativo', Ativo.data_aquisicao)
         
         if tipo_filter:
-            query = query.filter_by(tipo_ativo=tipo_filter)
+            query = query.filter(Ativo.tipo_ativo == tipo_filter)
         if status_filter:
-            query = query.filter_by(status=status_filter)
+            query = query.filter(Ativo.status == status_filter)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Ativo.data_aquisicao.desc()), serializar, 'ativo', 'ativos')
+        
+        if paginacao_solicitada():
+            return jsonify(paginar_keyset(
+                query, Ativo.data_aquisicao, Ativo.id,
+                serializar=serializar,
+                filtrada=bool(tipo_filter or status_filter)
+            )), 200
         
         ativos = query.order_by(Ativo.data_aquisicao.desc()).all()
-        return jsonify([ativo.to_dict() for ativo in ativos]), 200
+        return jsonify([serializar(ativo) for ativo in ativos]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -45,19 +64,21 @@ def criar_ativo():
         if dados.get('data_vencimento_licenca'):
             ativo.data_vencimento_licenca = datetime.strptime(dados['data_vencimento_licenca'], '%Y-%m-%d').date()
         
+        ativo.valor_atual = ativo.calcular_depreciacao()
         db.session.add(ativo)
         db.session.commit()
         
-        return jsonify(ativo.to_dict()), 201
+        return jsonify(recarregar(ativo, 'ativo_lista').to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @ativo_bp.route('/ativos/<int:ativo_id>', methods=['GET'])
+@com_etag('ativos', 'usuarios', 'centros_custo')
 def obter_ativo(ativo_id):
     """Obtém um ativo específico"""
     try:
-        ativo = Ativo.query.get_or_404(ativo_id)
+        ativo = com_perfil(Ativo.query, 'ativo_lista').get_or_404(ativo_id)
         return jsonify(ativo.to_dict()), 200
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -86,27 +107,55 @@ def atualizar_ativo(ativo_id):
         if dados.get('data_vencimento_licenca'):
             ativo.data_vencimento_licenca = datetime.strptime(dados['data_vencimento_licenca'], '%Y-%m-%d').date()
         
+        ativo.valor_atual = ativo.calcular_depreciacao()
         db.session.commit()
         
-        return jsonify(ativo.to_dict()), 200
+        return jsonify(recarregar(ativo, 'ativo_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @ativo_bp.route('/ativos/licencas-vencendo', methods=['GET'])
+@com_etag('ativos', 'usuarios', 'centros_custo')
 def listar_licencas_vencendo():
     """Lista ativos com licenças vencendo nos próximos 30 dias"""
     try:
         from datetime import timedelta
         data_limite = date.today() + timedelta(days=30)
         
-        ativos = Ativo.query.filter(
+        query, serializar = consulta_listagem(Ativo.query, 'ativo')
+        query = query.filter(
             Ativo.data_vencimento_licenca.isnot(None),
             Ativo.data_vencimento_licenca <= data_limite,
             Ativo.status == 'ativo'
-        ).order_by(Ativo.data_vencimento_licenca).all()
+        ).order_by(Ativo.data_vencimento_licenca)
+        
+        if formato_exportacao():
+            return exportar(query, serializar, 'ativo', 'licencas_vencendo')
+        
+        ativos = query.all()
+        
+        return jsonify([serializar(ativo) for ativo in ativos]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@ativo_bp.route('/ativos/projecao-depreciacao', methods=['GET'])
+def projecao_depreciacao():
+    """Projeta o valor contábil dos ativos para os próximos anos"""
+    try:
+        anos = request.args.get('anos', 5)
+        try:
+            anos = int(anos)
+        except ValueError:
+            raise ParametroInvalido('Parâmetro anos inválido')
+        if not 1 <= anos <= ANOS_PROJECAO_MAXIMO:
+            raise ParametroInvalido(f'Parâmetro anos deve estar entre 1 e {ANOS_PROJECAO_MAXIMO}')
         
-        return jsonify([ativo.to_dict() for ativo in ativos]), 200
+        return jsonify(projetar_depreciacao(anos, request.args.get('agrupar') or None)), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
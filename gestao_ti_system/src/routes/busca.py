@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+from src.utils.busca_global import (
+    LIMITE_POR_TIPO_MAXIMO, LIMITE_POR_TIPO_PADRAO, TAMANHO_MINIMO_TERMO, buscar_global
+)
+from src.utils.paginacao import ParametroInvalido
+
+busca_bp = Blueprint('busca', __name__)
+
+@busca_bp.route('/busca', methods=['GET'])
+def busca_global():
+    """Busca rápida (autocomplete) em fornecedores, ativos, usuários e compras"""
+    try:
+        termo = (request.args.get('q') or '').strip()
+        tipos = [tipo.strip() for tipo in request.args.get('tipos', '').split(',') if tipo.strip()]
+        try:
+            limite = int(request.args.get('limit', LIMITE_POR_TIPO_PADRAO))
+        except ValueError:
+            raise ParametroInvalido('Parâmetro limit inválido')
+        limite = max(1, min(limite, LIMITE_POR_TIPO_MAXIMO))
+        
+        if len(termo) < TAMANHO_MINIMO_TERMO:
+            return jsonify({'termo': termo, 'resultados': []}), 200
+        
+        return jsonify({'termo': termo, 'resultados': buscar_global(termo, tipos, limite)}), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
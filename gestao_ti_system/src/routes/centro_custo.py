@@ -1,15 +1,29 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.centro_custo import CentroCusto
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import recarregar
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido
+from src.utils.versoes import com_etag
 
 centro_custo_bp = Blueprint('centro_custo', __name__)
 
 @centro_custo_bp.route('/centros-custo', methods=['GET'])
+@com_etag('centros_custo')
 def listar_centros_custo():
     """Lista todos os centros de custo"""
     try:
-        centros = CentroCusto.query.filter_by(ativo=True).all()
-        return jsonify([centro.to_dict() for centro in centros]), 200
+        query, serializar = consulta_listagem(CentroCusto.query, 'centro_custo')
+        query = query.filter_by(ativo=True)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(CentroCusto.codigo), serializar, 'centro_custo', 'centros')
+        
+        centros = query.all()
+        return jsonify([serializar(centro) for centro in centros]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -33,12 +47,13 @@ def criar_centro_custo():
         db.session.add(centro)
         db.session.commit()
         
-        return jsonify(centro.to_dict()), 201
+        return jsonify(recarregar(centro).to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @centro_custo_bp.route('/centros-custo/<int:centro_id>', methods=['GET'])
+@com_etag('centros_custo')
 def obter_centro_custo(centro_id):
     """Obtém um centro de custo específico"""
     try:
@@ -61,7 +76,7 @@ def atualizar_centro_custo(centro_id):
         
         db.session.commit()
         
-        return jsonify(centro.to_dict()), 200
+        return jsonify(recarregar(centro).to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
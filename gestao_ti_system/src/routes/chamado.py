@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.chamado import Chamado, HistoricoChamado
+from src.utils.busca_chamados import atualizar_documento_busca, buscar_chamados
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import com_perfil, recarregar
+from src.utils.duplicados import detector_duplicados
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido, ler_limite, paginacao_solicitada, paginar_keyset
+from src.utils.versoes import com_etag
 from datetime import datetime
 
 chamado_bp = Blueprint('chamado', __name__)
 
 @chamado_bp.route('/chamados', methods=['GET'])
+@com_etag('chamados', 'usuarios')
 def listar_chamados():
     """Lista todos os chamados"""
     try:
@@ -13,17 +21,29 @@ def listar_chamados():
         prioridade_filter = request.args.get('prioridade')
         tecnico_filter = request.args.get('tecnico_id')
         
-        query = Chamado.query
+        query, serializar = consulta_listagem(Chamado.query, 'chamado', Chamado.data_abertura)
         
         if status_filter:
-            query = query.filter_by(status=status_filter)
+            query = query.filter(Chamado.status == status_filter)
         if prioridade_filter:
-            query = query.filter_by(prioridade=prioridade_filter)
+            query = query.filter(Chamado.prioridade == prioridade_filter)
         if tecnico_filter:
-            query = query.filter_by(tecnico_atribuido_id=tecnico_filter)
+            query = query.filter(Chamado.tecnico_atribuido_id == tecnico_filter)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Chamado.data_abertura.desc()), serializar, 'chamado', 'chamados')
+        
+        if paginacao_solicitada():
+            return jsonify(paginar_keyset(
+                query, Chamado.data_abertura, Chamado.id,
+                serializar=serializar,
+                filtrada=bool(status_filter or prioridade_filter or tecnico_filter)
+            )), 200
         
         chamados = query.order_by(Chamado.data_abertura.desc()).all()
-        return jsonify([chamado.to_dict() for chamado in chamados]), 200
+        return jsonify([serializar(chamado) for chamado in chamados]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -45,31 +65,87 @@ def criar_chamado():
         # Gerar número do chamado
         chamado.numero_chamado = chamado.gerar_numero_chamado()
         
-        db.session.add(chamado)
-        db.session.flush()
-        
-        # Criar histórico inicial
-        historico = HistoricoChamado(
-            chamado_id=chamado.id,
+        # Criar histórico inicial (pela relação: chamado e histórico são
+        # gravados no mesmo flush)
+        chamado.historico.append(HistoricoChamado(
             usuario_id=dados['solicitante_id'],
             acao='Chamado criado',
             descricao='Chamado aberto pelo solicitante',
             status_novo='aberto'
-        )
-        db.session.add(historico)
+        ))
+        db.session.add(chamado)
+        db.session.flush()
+        atualizar_documento_busca(chamado.id)
         
         db.session.commit()
         
-        return jsonify(chamado.to_dict()), 201
+        chamado = recarregar(chamado, 'chamado_lista')
+        resultado = chamado.to_dict()
+        detector_duplicados.registrar(chamado)
+        try:
+            resultado['possiveis_duplicados'] = detector_duplicados.possiveis_duplicados(
+                chamado.titulo, chamado.descricao, excluir_id=chamado.id
+            )
+        except Exception:
+            # O chamado já foi gravado; a sugestão de duplicados é opcional
+            resultado['possiveis_duplicados'] = []
+        
+        return jsonify(resultado), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
+@chamado_bp.route('/chamados/duplicados', methods=['POST'])
+def verificar_duplicados():
+    """Lista chamados abertos parecidos com o título/descrição informados"""
+    try:
+        dados = request.get_json()
+        
+        duplicados = detector_duplicados.possiveis_duplicados(dados['titulo'], dados.get('descricao'))
+        
+        return jsonify({'possiveis_duplicados': duplicados}), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@chamado_bp.route('/chamados/busca', methods=['GET'])
+def buscar():
+    """Busca textual nos chamados (título, descrição, solução e histórico).
+
+    Com modo=similares retorna chamados resolvidos parecidos com o texto
+    de q ou com o chamado informado em chamado_id.
+    """
+    try:
+        q = (request.args.get('q') or '').strip()
+        modo = request.args.get('modo', 'busca')
+        limite = ler_limite()
+        
+        if modo == 'similares':
+            chamado_id = request.args.get('chamado_id', type=int)
+            if chamado_id:
+                referencia = Chamado.query.get_or_404(chamado_id)
+                q = f'{referencia.titulo} {referencia.descricao}'
+            if not q:
+                raise ParametroInvalido('Informe q ou chamado_id')
+            resultados = buscar_chamados(q, limite, similares=True, excluir_id=chamado_id)
+        elif modo == 'busca':
+            if not q:
+                raise ParametroInvalido('Parâmetro q é obrigatório')
+            resultados = buscar_chamados(q, limite, status=request.args.get('status'))
+        else:
+            raise ParametroInvalido('Modo inválido (use busca ou similares)')
+        
+        return jsonify({'itens': resultados}), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
 @chamado_bp.route('/chamados/<int:chamado_id>', methods=['GET'])
+@com_etag('chamados', 'usuarios', 'historico_chamados')
 def obter_chamado(chamado_id):
     """Obtém um chamado específico"""
     try:
-        chamado = Chamado.query.get_or_404(chamado_id)
+        chamado = com_perfil(Chamado.query, 'chamado_detalhe').get_or_404(chamado_id)
         resultado = chamado.to_dict()
         resultado['historico'] = [hist.to_dict() for hist in chamado.historico]
         return jsonify(resultado), 200
@@ -98,10 +174,11 @@ def atribuir_chamado(chamado_id):
             status_novo='em_andamento'
         )
         db.session.add(historico)
+        atualizar_documento_busca(chamado.id)
         
         db.session.commit()
         
-        return jsonify(chamado.to_dict()), 200
+        return jsonify(recarregar(chamado, 'chamado_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -128,10 +205,12 @@ def resolver_chamado(chamado_id):
             status_novo='resolvido'
         )
         db.session.add(historico)
+        atualizar_documento_busca(chamado.id)
         
         db.session.commit()
+        detector_duplicados.descartar(chamado.id)
         
-        return jsonify(chamado.to_dict()), 200
+        return jsonify(recarregar(chamado, 'chamado_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -157,10 +236,12 @@ def fechar_chamado(chamado_id):
             status_novo='fechado'
         )
         db.session.add(historico)
+        atualizar_documento_busca(chamado.id)
         
         db.session.commit()
+        detector_duplicados.descartar(chamado.id)
         
-        return jsonify(chamado.to_dict()), 200
+        return jsonify(recarregar(chamado, 'chamado_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
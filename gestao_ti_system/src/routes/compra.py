@@ -1,22 +1,40 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.compra import Compra, ProdutoAdquirido, RateioCompra
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import com_perfil, recarregar
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido, paginacao_solicitada, paginar_keyset
+from src.utils.versoes import com_etag
 from datetime import datetime
 
 compra_bp = Blueprint('compra', __name__)
 
 @compra_bp.route('/compras', methods=['GET'])
+@com_etag('compras', 'fornecedores', 'centros_custo', 'usuarios')
 def listar_compras():
     """Lista todas as compras"""
     try:
         status_filter = request.args.get('status')
-        query = Compra.query
+        query, serializar = consulta_listagem(Compra.query, 'compra', Compra.data_solicitacao)
         
         if status_filter:
-            query = query.filter_by(status=status_filter)
+            query = query.filter(Compra.status == status_filter)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Compra.data_solicitacao.desc()), serializar, 'compra', 'compras')
+        
+        if paginacao_solicitada():
+            return jsonify(paginar_keyset(
+                query, Compra.data_solicitacao, Compra.id,
+                serializar=serializar,
+                filtrada=bool(status_filter)
+            )), 200
         
         compras = query.order_by(Compra.data_solicitacao.desc()).all()
-        return jsonify([compra.to_dict() for compra in compras]), 200
+        return jsonify([serializar(compra) for compra in compras]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -26,31 +44,18 @@ def criar_compra():
     try:
         dados = request.get_json()
         
-        # Gerar número do pedido automaticamente
-        hoje = datetime.now()
-        ano = hoje.year
-        ultimo_pedido = Compra.query.filter(
-            Compra.numero_pedido.like(f'PED{ano}%')
-        ).order_by(Compra.numero_pedido.desc()).first()
-        
-        if ultimo_pedido:
-            ultimo_numero = int(ultimo_pedido.numero_pedido.replace(f'PED{ano}', ''))
-            novo_numero = ultimo_numero + 1
-        else:
-            novo_numero = 1
-        
-        numero_pedido = f'PED{ano}{novo_numero:06d}'
-        
         compra = Compra(
             fornecedor_id=dados['fornecedor_id'],
             centro_custo_id=dados['centro_custo_id'],
             usuario_solicitante_id=dados['usuario_solicitante_id'],
-            numero_pedido=numero_pedido,
             descricao=dados['descricao'],
             valor_total=dados['valor_total'],
             observacoes=dados.get('observacoes')
         )
         
+        # Gerar número do pedido automaticamente
+        compra.numero_pedido = compra.gerar_numero_pedido()
+        
         db.session.add(compra)
         db.session.flush()  # Para obter o ID da compra
         
@@ -80,16 +85,17 @@ def criar_compra():
         
         db.session.commit()
         
-        return jsonify(compra.to_dict()), 201
+        return jsonify(recarregar(compra, 'compra_lista').to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @compra_bp.route('/compras/<int:compra_id>', methods=['GET'])
+@com_etag('compras', 'fornecedores', 'centros_custo', 'usuarios', 'produtos_adquiridos', 'rateio_compras')
 def obter_compra(compra_id):
     """Obtém uma compra específica"""
     try:
-        compra = Compra.query.get_or_404(compra_id)
+        compra = com_perfil(Compra.query, 'compra_detalhe').get_or_404(compra_id)
         resultado = compra.to_dict()
         resultado['produtos'] = [produto.to_dict() for produto in compra.produtos]
         resultado['rateios'] = [rateio.to_dict() for rateio in compra.rateios]
@@ -121,7 +127,7 @@ def atualizar_compra(compra_id):
         
         db.session.commit()
         
-        return jsonify(compra.to_dict()), 200
+        return jsonify(recarregar(compra, 'compra_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -140,7 +146,7 @@ def atualizar_status_compra(compra_id):
         
         db.session.commit()
         
-        return jsonify(compra.to_dict()), 200
+        return jsonify(recarregar(compra, 'compra_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -1,13 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from src.utils.arquivos_config import CONFIG_DIR, config_logo, config_smtp
 from src.utils.email_service import email_service
-import json
+from src.utils.saude_smtp import monitor_smtp
 import os
 from werkzeug.utils import secure_filename
 
 configuracoes_bp = Blueprint('configuracoes', __name__)
 
-# Diretório para armazenar configurações
-CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
+# Diretório do logo enviado (as configurações ficam em CONFIG_DIR)
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'uploads')
 
 # Criar diretórios se não existirem
@@ -18,13 +18,11 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 def obter_configuracoes_smtp():
     """Obter configurações SMTP"""
     try:
-        config_file = os.path.join(CONFIG_DIR, 'smtp.json')
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-                # Não retornar a senha por segurança
-                config['senha'] = '••••••••' if config.get('senha') else ''
-                return jsonify(config)
+        config = config_smtp.ler()
+        if config is not None:
+            # Não retornar a senha por segurança
+            config['senha'] = '••••••••' if config.get('senha') else ''
+            return jsonify(config)
         else:
             # Retornar configuração padrão
             return jsonify({
@@ -33,6 +31,7 @@ def obter_configuracoes_smtp():
                 'usuario': '',
                 'senha': '',
                 'ssl': True,
+                'autenticar': True,
                 'remetente_nome': 'Sistema de Gestão TI',
                 'remetente_email': ''
             })
@@ -49,23 +48,14 @@ def salvar_configuracoes_smtp():
         if not data.get('servidor') or not data.get('usuario'):
             return jsonify({'erro': 'Servidor e usuário são obrigatórios'}), 400
         
-        config_file = os.path.join(CONFIG_DIR, 'smtp.json')
-        
         # Se a senha não foi alterada (veio como ••••••••), manter a anterior
         if data.get('senha') == '••••••••':
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    existing_config = json.load(f)
-                    data['senha'] = existing_config.get('senha', '')
-            else:
-                data['senha'] = ''
-        
-        # Salvar configurações
-        with open(config_file, 'w') as f:
-            json.dump(data, f, indent=2)
+            existing_config = config_smtp.ler() or {}
+            data['senha'] = existing_config.get('senha', '')
         
-        # Recarregar configurações no serviço de email
-        email_service.config = email_service._load_config()
+        # Salvar configurações (os demais workers as releem em até 1 s)
+        config_smtp.gravar(data, indent=2)
+        monitor_smtp.agendar()
         
         return jsonify({'mensagem': 'Configurações SMTP salvas com sucesso'})
     except Exception as e:
@@ -102,9 +92,7 @@ def salvar_logo():
         file.save(file_path)
         
         # Salvar caminho do logo nas configurações
-        config_file = os.path.join(CONFIG_DIR, 'logo.json')
-        with open(config_file, 'w') as f:
-            json.dump({'logo_path': filename}, f)
+        config_logo.gravar({'logo_path': filename})
         
         return jsonify({'mensagem': 'Logo salvo com sucesso', 'arquivo': filename})
     except Exception as e:
@@ -114,11 +102,9 @@ def salvar_logo():
 def obter_logo():
     """Obter logo da empresa"""
     try:
-        config_file = os.path.join(CONFIG_DIR, 'logo.json')
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-                return jsonify(config)
+        config = config_logo.ler()
+        if config is not None:
+            return jsonify(config)
         else:
             return jsonify({'logo_path': None})
     except Exception as e:
@@ -157,24 +143,42 @@ def testar_smtp():
 
 @configuracoes_bp.route('/smtp/status', methods=['GET'])
 def status_smtp():
-    """Verificar status da configuração SMTP"""
+    """Verificar status da configuração SMTP (última verificação feita em
+    segundo plano, sem conectar ao servidor)"""
     try:
-        is_configured = email_service.is_configured()
-        
-        if is_configured:
-            success, message = email_service.test_connection()
-            return jsonify({
-                'configurado': True,
-                'conexao_ok': success,
-                'mensagem': message
-            })
-        else:
+        if not email_service.is_configured():
             return jsonify({
                 'configurado': False,
                 'conexao_ok': False,
                 'mensagem': 'SMTP não configurado'
             })
+        
+        resultado = monitor_smtp.situacao()
+        if resultado is None:
+            return jsonify({
+                'configurado': True,
+                'conexao_ok': None,
+                'mensagem': 'Verificação da conexão em andamento',
+                'verificado_em': None,
+                'latencia_ms': None
+            })
+        return jsonify(resultado)
             
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
+@configuracoes_bp.route('/smtp/status/verificar', methods=['POST'])
+def verificar_status_smtp():
+    """Testar a conexão SMTP agora (timeout opcional em segundos, máx. 30)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            timeout = float(data.get('timeout') or current_app.config.get('SMTP_TIMEOUT_VERIFICACAO', 5))
+        except (TypeError, ValueError):
+            return jsonify({'erro': 'timeout deve ser um número de segundos'}), 400
+        if not 0 < timeout <= 30:
+            return jsonify({'erro': 'timeout deve estar entre 0 e 30 segundos'}), 400
+        
+        return jsonify(monitor_smtp.verificar(timeout))
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.conta_mensal import ContaMensal
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import com_perfil, recarregar
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido
+from src.utils.versoes import com_etag
 from datetime import datetime, date
 
 conta_mensal_bp = Blueprint('conta_mensal', __name__)
 
 @conta_mensal_bp.route('/contas-mensais', methods=['GET'])
+@com_etag('contas_mensais', 'fornecedores', 'centros_custo')
 def listar_contas_mensais():
     """Lista todas as contas mensais"""
     try:
@@ -13,7 +19,7 @@ def listar_contas_mensais():
         mes_filter = request.args.get('mes')
         ano_filter = request.args.get('ano')
         
-        query = ContaMensal.query
+        query, serializar = consulta_listagem(ContaMensal.query, 'conta_mensal')
         
         if status_filter:
             query = query.filter_by(status_pagamento=status_filter)
@@ -24,8 +30,15 @@ def listar_contas_mensais():
                 db.extract('year', ContaMensal.data_vencimento) == int(ano_filter)
             )
         
-        contas = query.order_by(ContaMensal.data_vencimento).all()
-        return jsonify([conta.to_dict() for conta in contas]), 200
+        query = query.order_by(ContaMensal.data_vencimento)
+        
+        if formato_exportacao():
+            return exportar(query, serializar, 'conta_mensal', 'contas_mensais')
+        
+        contas = query.all()
+        return jsonify([serializar(conta) for conta in contas]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -52,16 +65,17 @@ def criar_conta_mensal():
         db.session.add(conta)
         db.session.commit()
         
-        return jsonify(conta.to_dict()), 201
+        return jsonify(recarregar(conta, 'conta_mensal_lista').to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @conta_mensal_bp.route('/contas-mensais/<int:conta_id>', methods=['GET'])
+@com_etag('contas_mensais', 'fornecedores', 'centros_custo')
 def obter_conta_mensal(conta_id):
     """Obtém uma conta mensal específica"""
     try:
-        conta = ContaMensal.query.get_or_404(conta_id)
+        conta = com_perfil(ContaMensal.query, 'conta_mensal_lista').get_or_404(conta_id)
         return jsonify(conta.to_dict()), 200
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -90,7 +104,7 @@ def atualizar_conta_mensal(conta_id):
         
         db.session.commit()
         
-        return jsonify(conta.to_dict()), 200
+        return jsonify(recarregar(conta, 'conta_mensal_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -106,38 +120,52 @@ def pagar_conta_mensal(conta_id):
         
         db.session.commit()
         
-        return jsonify(conta.to_dict()), 200
+        return jsonify(recarregar(conta, 'conta_mensal_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @conta_mensal_bp.route('/contas-mensais/vencidas', methods=['GET'])
+@com_etag('contas_mensais', 'fornecedores', 'centros_custo')
 def listar_contas_vencidas():
     """Lista contas vencidas"""
     try:
-        contas = ContaMensal.query.filter(
+        query, serializar = consulta_listagem(ContaMensal.query, 'conta_mensal')
+        query = query.filter(
             ContaMensal.data_vencimento < date.today(),
             ContaMensal.status_pagamento == 'pendente'
-        ).order_by(ContaMensal.data_vencimento).all()
+        ).order_by(ContaMensal.data_vencimento)
+        
+        if formato_exportacao():
+            return exportar(query, serializar, 'conta_mensal', 'contas_vencidas')
         
-        return jsonify([conta.to_dict() for conta in contas]), 200
+        return jsonify([serializar(conta) for conta in query.all()]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
 @conta_mensal_bp.route('/contas-mensais/vencendo', methods=['GET'])
+@com_etag('contas_mensais', 'fornecedores', 'centros_custo')
 def listar_contas_vencendo():
     """Lista contas vencendo nos próximos 7 dias"""
     try:
         from datetime import timedelta
         data_limite = date.today() + timedelta(days=7)
         
-        contas = ContaMensal.query.filter(
+        query, serializar = consulta_listagem(ContaMensal.query, 'conta_mensal')
+        query = query.filter(
             ContaMensal.data_vencimento <= data_limite,
             ContaMensal.data_vencimento >= date.today(),
             ContaMensal.status_pagamento == 'pendente'
-        ).order_by(ContaMensal.data_vencimento).all()
+        ).order_by(ContaMensal.data_vencimento)
+        
+        if formato_exportacao():
+            return exportar(query, serializar, 'conta_mensal', 'contas_vencendo')
         
-        return jsonify([conta.to_dict() for conta in contas]), 200
+        return jsonify([serializar(conta) for conta in query.all()]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
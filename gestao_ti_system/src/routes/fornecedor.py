@@ -1,15 +1,29 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.fornecedor import Fornecedor
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import recarregar
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido
+from src.utils.versoes import com_etag
 
 fornecedor_bp = Blueprint('fornecedor', __name__)
 
 @fornecedor_bp.route('/fornecedores', methods=['GET'])
+@com_etag('fornecedores')
 def listar_fornecedores():
     """Lista todos os fornecedores"""
     try:
-        fornecedores = Fornecedor.query.filter_by(ativo=True).all()
-        return jsonify([fornecedor.to_dict() for fornecedor in fornecedores]), 200
+        query, serializar = consulta_listagem(Fornecedor.query, 'fornecedor')
+        query = query.filter_by(ativo=True)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Fornecedor.nome), serializar, 'fornecedor', 'fornecedores')
+        
+        fornecedores = query.all()
+        return jsonify([serializar(fornecedor) for fornecedor in fornecedores]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -37,12 +51,13 @@ def criar_fornecedor():
         db.session.add(fornecedor)
         db.session.commit()
         
-        return jsonify(fornecedor.to_dict()), 201
+        return jsonify(recarregar(fornecedor).to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @fornecedor_bp.route('/fornecedores/<int:fornecedor_id>', methods=['GET'])
+@com_etag('fornecedores')
 def obter_fornecedor(fornecedor_id):
     """Obtém um fornecedor específico"""
     try:
@@ -68,7 +83,7 @@ def atualizar_fornecedor(fornecedor_id):
         
         db.session.commit()
         
-        return jsonify(fornecedor.to_dict()), 200
+        return jsonify(recarregar(fornecedor).to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
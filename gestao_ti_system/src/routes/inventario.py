@@ -1,28 +1,46 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
-from src.models.inventario import Inventario, MovimentacaoInventario
+from src.models.inventario import Inventario
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import com_perfil, recarregar
+from src.utils.estoque import ItemNaoEncontrado, MovimentacaoInvalida, movimentar_estoque, movimentar_estoque_lote
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido, paginacao_solicitada, paginar_keyset
+from src.utils.versoes import com_etag
 from datetime import datetime
 
 inventario_bp = Blueprint('inventario', __name__)
 
 @inventario_bp.route('/inventario', methods=['GET'])
+@com_etag('inventario', 'centros_custo', 'fornecedores')
 def listar_inventario():
     """Lista todos os itens do inventário"""
     try:
         tipo_filter = request.args.get('tipo')
         estoque_baixo = request.args.get('estoque_baixo')
         
-        query = Inventario.query
+        query, serializar = consulta_listagem(Inventario.query, 'inventario', Inventario.nome)
         
         if tipo_filter:
             query = query.filter_by(tipo_item=tipo_filter)
+        if estoque_baixo == 'true':
+            query = query.filter(Inventario.estoque_baixo)
         
-        itens = query.order_by(Inventario.nome).all()
+        if formato_exportacao():
+            return exportar(query.order_by(Inventario.nome), serializar, 'inventario', 'inventario')
         
-        if estoque_baixo == 'true':
-            itens = [item for item in itens if item.verificar_estoque_minimo()]
+        if paginacao_solicitada():
+            return jsonify(paginar_keyset(
+                query, Inventario.nome, Inventario.id,
+                serializar=serializar,
+                descendente=False,
+                filtrada=bool(tipo_filter or estoque_baixo == 'true')
+            )), 200
         
-        return jsonify([item.to_dict() for item in itens]), 200
+        itens = query.order_by(Inventario.nome).all()
+        return jsonify([serializar(item) for item in itens]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -51,16 +69,17 @@ def criar_item_inventario():
         db.session.add(item)
         db.session.commit()
         
-        return jsonify(item.to_dict()), 201
+        return jsonify(recarregar(item, 'inventario_lista').to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @inventario_bp.route('/inventario/<int:item_id>', methods=['GET'])
+@com_etag('inventario', 'centros_custo', 'fornecedores', 'movimentacao_inventario', 'usuarios')
 def obter_item_inventario(item_id):
     """Obtém um item específico do inventário"""
     try:
-        item = Inventario.query.get_or_404(item_id)
+        item = com_perfil(Inventario.query, 'inventario_detalhe').get_or_404(item_id)
         resultado = item.to_dict()
         resultado['movimentacoes'] = [mov.to_dict() for mov in item.movimentacoes]
         return jsonify(resultado), 200
@@ -71,46 +90,78 @@ def obter_item_inventario(item_id):
 def movimentar_inventario(item_id):
     """Registra uma movimentação no inventário"""
     try:
-        item = Inventario.query.get_or_404(item_id)
         dados = request.get_json()
         
-        quantidade_anterior = item.quantidade
-        tipo_movimentacao = dados['tipo_movimentacao']
-        quantidade_movimento = dados['quantidade']
-        
-        # Calcular nova quantidade
-        if tipo_movimentacao == 'entrada':
-            nova_quantidade = quantidade_anterior + quantidade_movimento
-        elif tipo_movimentacao == 'saida':
-            nova_quantidade = quantidade_anterior - quantidade_movimento
-            if nova_quantidade < 0:
-                return jsonify({'erro': 'Quantidade insuficiente em estoque'}), 400
-        elif tipo_movimentacao == 'ajuste':
-            nova_quantidade = quantidade_movimento
-        else:
-            return jsonify({'erro': 'Tipo de movimentação inválido'}), 400
-        
-        # Atualizar quantidade do item
-        item.quantidade = nova_quantidade
-        
-        # Registrar movimentação
-        movimentacao = MovimentacaoInventario(
-            inventario_id=item.id,
-            usuario_id=dados['usuario_id'],
-            tipo_movimentacao=tipo_movimentacao,
-            quantidade=quantidade_movimento,
-            quantidade_anterior=quantidade_anterior,
-            quantidade_nova=nova_quantidade,
-            motivo=dados.get('motivo')
+        # Quantidade atualizada no banco por UPDATE condicional (sem ler o item antes)
+        movimentacoes = movimentar_estoque(
+            item_id,
+            dados['tipo_movimentacao'],
+            dados['quantidade'],
+            dados['usuario_id'],
+            motivo=dados.get('motivo'),
+            item_destino_id=dados.get('item_destino_id')
+        )
+        db.session.commit()
+        
+        itens = {
+            item.id: item
+            for item in com_perfil(Inventario.query, 'inventario_lista').populate_existing().filter(
+                Inventario.id.in_([mov.inventario_id for mov in movimentacoes])
+            )
+        }
+        movimentacoes = [recarregar(movimentacao) for movimentacao in movimentacoes]
+        resultado = {
+            'item': itens[item_id].to_dict(),
+            'movimentacao': movimentacoes[0].to_dict()
+        }
+        if len(movimentacoes) > 1:
+            resultado['item_destino'] = itens[movimentacoes[1].inventario_id].to_dict()
+            resultado['movimentacao_destino'] = movimentacoes[1].to_dict()
+        
+        return jsonify(resultado), 200
+    except ItemNaoEncontrado as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 404
+    except MovimentacaoInvalida as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@inventario_bp.route('/inventario/movimentacoes/lote', methods=['POST'])
+def movimentar_inventario_lote():
+    """Registra várias movimentações de inventário em uma única transação"""
+    try:
+        dados = request.get_json()
+        modo = dados.get('modo', 'tudo_ou_nada')
+        if modo not in ('tudo_ou_nada', 'melhor_esforco'):
+            return jsonify({'erro': 'Modo inválido (use tudo_ou_nada ou melhor_esforco)'}), 400
+        
+        resultados, houve_falha = movimentar_estoque_lote(
+            dados.get('movimentacoes') or [],
+            dados.get('usuario_id'),
+            tudo_ou_nada=(modo == 'tudo_ou_nada')
         )
         
-        db.session.add(movimentacao)
+        if houve_falha and modo == 'tudo_ou_nada':
+            db.session.rollback()
+            return jsonify({
+                'erro': 'Lote rejeitado: nenhuma movimentação foi aplicada',
+                'resultados': resultados
+            }), 400
+        
         db.session.commit()
         
+        aplicadas = sum(1 for resultado in resultados if resultado['sucesso'])
         return jsonify({
-            'item': item.to_dict(),
-            'movimentacao': movimentacao.to_dict()
+            'aplicadas': aplicadas,
+            'falhas': len(resultados) - aplicadas,
+            'resultados': resultados
         }), 200
+    except MovimentacaoInvalida as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -137,19 +188,26 @@ def atualizar_item_inventario(item_id):
         
         db.session.commit()
         
-        return jsonify(item.to_dict()), 200
+        return jsonify(recarregar(item, 'inventario_lista').to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @inventario_bp.route('/inventario/estoque-baixo', methods=['GET'])
+@com_etag('inventario', 'centros_custo', 'fornecedores')
 def listar_estoque_baixo():
     """Lista itens com estoque abaixo do mínimo"""
     try:
-        itens = Inventario.query.all()
-        itens_baixo = [item for item in itens if item.verificar_estoque_minimo()]
+        query, serializar = consulta_listagem(Inventario.query, 'inventario')
+        query = query.filter(Inventario.estoque_baixo).order_by(Inventario.nome)
+        
+        if formato_exportacao():
+            return exportar(query, serializar, 'inventario', 'estoque_baixo')
         
-        return jsonify([item.to_dict() for item in itens_baixo]), 200
+        itens = query.all()
+        return jsonify([serializar(item) for item in itens]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
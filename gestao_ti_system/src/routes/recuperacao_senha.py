@@ -1,18 +1,14 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import Usuario, db
-from src.utils.email_service import email_service
+from src.utils.caixa_saida import enfileirar_email, entregador_emails
+from src.utils.email_service import email_service, link_recuperacao_senha
+from src.utils.tokens_recuperacao import armazenamento_tokens
 import secrets
 import hashlib
-from datetime import datetime, timedelta
-import json
-import os
+from datetime import datetime
 
 recuperacao_bp = Blueprint('recuperacao', __name__)
 
-# Diretório para armazenar tokens temporários
-TOKENS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp', 'tokens')
-os.makedirs(TOKENS_DIR, exist_ok=True)
-
 @recuperacao_bp.route('/esqueceu-senha', methods=['POST'])
 def esqueceu_senha():
     """Solicitar recuperação de senha"""
@@ -36,34 +32,21 @@ def esqueceu_senha():
         token_hash = hashlib.sha256(token.encode()).hexdigest()
         
         # Salvar token temporário (válido por 1 hora)
-        token_data = {
-            'usuario_id': usuario.id,
-            'email': usuario.email,
-            'token_hash': token_hash,
-            'criado_em': datetime.now().isoformat(),
-            'expira_em': (datetime.now() + timedelta(hours=1)).isoformat()
-        }
-        
-        token_file = os.path.join(TOKENS_DIR, f'{token_hash}.json')
-        with open(token_file, 'w') as f:
-            json.dump(token_data, f)
-        
-        # Em um sistema real, aqui enviaria o email
-        # Tentar enviar email se SMTP estiver configurado
+        armazenamento_tokens().criar(token_hash, usuario.id)
+        
+        # O email vai para a caixa de saída e é enviado em segundo plano
+        # (utils/caixa_saida.py), sem prender a requisição no SMTP
         if email_service.is_configured():
-            success, message = email_service.send_password_recovery_email(
-                email=usuario.email,
-                token=token,
-                user_name=usuario.nome
-            )
-            if not success:
-                print(f"Erro ao enviar email: {message}")
+            enfileirar_email(usuario.email, *email_service.conteudo_recuperacao_senha(token, usuario.nome))
         else:
-            print(f"Link de recuperação: http://18.219.145.132/redefinir-senha?token={token}")
+            print(f"Link de recuperação: {link_recuperacao_senha(token)}")
+        db.session.commit()
+        entregador_emails.acordar()
         
         return jsonify({'mensagem': 'Se o email existir, você receberá um link de recuperação'}), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @recuperacao_bp.route('/verificar-token-recuperacao', methods=['GET'])
@@ -77,21 +60,14 @@ def verificar_token():
         
         # Criar hash do token
         token_hash = hashlib.sha256(token.encode()).hexdigest()
-        token_file = os.path.join(TOKENS_DIR, f'{token_hash}.json')
-        
-        # Verificar se o arquivo do token existe
-        if not os.path.exists(token_file):
+        dados_token = armazenamento_tokens().obter(token_hash)
+        if dados_token is None:
             return jsonify({'erro': 'Token inválido'}), 400
         
-        # Ler dados do token
-        with open(token_file, 'r') as f:
-            token_data = json.load(f)
-        
-        # Verificar se o token não expirou
-        expira_em = datetime.fromisoformat(token_data['expira_em'])
-        if datetime.now() > expira_em:
-            # Remover token expirado
-            os.remove(token_file)
+        # Verificar se o token não expirou (GET é somente leitura: o
+        # expirado é apagado pela limpeza periódica)
+        _, expira_em = dados_token
+        if datetime.utcnow() > expira_em:
             return jsonify({'erro': 'Token expirado'}), 400
         
         return jsonify({'mensagem': 'Token válido'}), 200
@@ -115,35 +91,28 @@ def redefinir_senha():
         
         # Criar hash do token
         token_hash = hashlib.sha256(token.encode()).hexdigest()
-        token_file = os.path.join(TOKENS_DIR, f'{token_hash}.json')
         
-        # Verificar se o arquivo do token existe
-        if not os.path.exists(token_file):
+        # Consome o token (uso único) na mesma transação da troca de senha
+        dados_token = armazenamento_tokens().consumir(token_hash)
+        if dados_token is None:
             return jsonify({'erro': 'Token inválido'}), 400
         
-        # Ler dados do token
-        with open(token_file, 'r') as f:
-            token_data = json.load(f)
-        
-        # Verificar se o token não expirou
-        expira_em = datetime.fromisoformat(token_data['expira_em'])
-        if datetime.now() > expira_em:
-            # Remover token expirado
-            os.remove(token_file)
+        # Verificar se o token não expirou (o expirado já foi removido)
+        usuario_id, expira_em = dados_token
+        if datetime.utcnow() > expira_em:
+            db.session.commit()
             return jsonify({'erro': 'Token expirado'}), 400
         
         # Buscar usuário
-        usuario = Usuario.query.get(token_data['usuario_id'])
+        usuario = db.session.get(Usuario, usuario_id)
         if not usuario or not usuario.ativo:
+            db.session.rollback()
             return jsonify({'erro': 'Usuário não encontrado'}), 404
         
         # Atualizar senha
-        usuario.definir_senha(nova_senha)
+        usuario.set_senha(nova_senha)
         db.session.commit()
         
-        # Remover token usado
-        os.remove(token_file)
-        
         return jsonify({'mensagem': 'Senha redefinida com sucesso'}), 200
         
     except Exception as e:
@@ -151,21 +120,12 @@ def redefinir_senha():
         return jsonify({'erro': str(e)}), 500
 
 def limpar_tokens_expirados():
-    """Função utilitária para limpar tokens expirados"""
+    """Função utilitária para limpar tokens expirados (ver também o comando
+    `flask limpar-tokens-recuperacao`)"""
     try:
-        for filename in os.listdir(TOKENS_DIR):
-            if filename.endswith('.json'):
-                token_file = os.path.join(TOKENS_DIR, filename)
-                try:
-                    with open(token_file, 'r') as f:
-                        token_data = json.load(f)
-                    
-                    expira_em = datetime.fromisoformat(token_data['expira_em'])
-                    if datetime.now() > expira_em:
-                        os.remove(token_file)
-                except:
-                    # Se houver erro ao ler o arquivo, remove ele
-                    os.remove(token_file)
-    except:
-        pass
-
+        total = armazenamento_tokens().purgar()
+        db.session.commit()
+        return total
+    except Exception:
+        db.session.rollback()
+        return 0
@@ -0,0 +1,26 @@
+import time
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from src.models.user import db
+from src.utils.pool import estatisticas_pool
+from src.utils.replicas import monitor_replicas
+
+saude_bp = Blueprint('saude', __name__)
+
+@saude_bp.route('/health/db', methods=['GET'])
+def saude_banco():
+    """Verifica a conexão com o banco e informa a situação do pool e das
+    réplicas vista por este worker"""
+    inicio = time.perf_counter()
+    try:
+        # Direto no engine do primário (a sessão mandaria o GET para a réplica)
+        with db.engine.connect() as conexao:
+            conexao.execute(text('SELECT 1'))
+        resultado = {'status': 'ok', 'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2)}
+        codigo = 200
+    except Exception as e:
+        resultado = {'status': 'erro', 'erro': str(e)}
+        codigo = 503
+    resultado['pool'] = estatisticas_pool(db.engine)
+    resultado['replicas'] = monitor_replicas.situacao()
+    return jsonify(resultado), codigo
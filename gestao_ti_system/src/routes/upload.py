@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify, current_app, send_from_directory
 import os
-import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from src.models.user import db
+from src.utils.anexos import caminho_objeto, localizar_anexo, salvar_anexo
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -25,30 +26,39 @@ def upload_arquivo():
             return jsonify({'erro': 'Nenhum arquivo selecionado'}), 400
         
         if arquivo and allowed_file(arquivo.filename):
-            # Gerar nome único para o arquivo
             filename = secure_filename(arquivo.filename)
-            nome_unico = f"{uuid.uuid4()}_{filename}"
             
-            # Salvar arquivo
-            caminho_arquivo = os.path.join(current_app.config['UPLOAD_FOLDER'], nome_unico)
-            arquivo.save(caminho_arquivo)
+            # Salvar arquivo (conteúdo repetido é guardado uma única vez)
+            sha256, tamanho, duplicado = salvar_anexo(arquivo)
+            db.session.commit()
             
             return jsonify({
                 'mensagem': 'Arquivo enviado com sucesso',
-                'nome_arquivo': nome_unico,
+                'nome_arquivo': f"{sha256}_{filename}",
                 'nome_original': filename,
-                'caminho': caminho_arquivo
+                'caminho': os.path.join(current_app.config['UPLOAD_FOLDER'], caminho_objeto(sha256)),
+                'sha256': sha256,
+                'tamanho': tamanho,
+                'duplicado': duplicado
             }), 200
         else:
             return jsonify({'erro': 'Tipo de arquivo não permitido'}), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @upload_bp.route('/uploads/<filename>')
 def download_arquivo(filename):
     """Baixa um arquivo enviado"""
     try:
-        return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+        caminho, nome_original = localizar_anexo(filename)
+        if nome_original is None:
+            return send_from_directory(current_app.config['UPLOAD_FOLDER'], caminho)
+        # Conteúdo endereçado pelo hash nunca muda
+        return send_from_directory(
+            current_app.config['UPLOAD_FOLDER'], caminho,
+            download_name=nome_original, max_age=365 * 24 * 3600
+        )
     except Exception as e:
         return jsonify({'erro': str(e)}), 404
 
@@ -56,7 +66,8 @@ def download_arquivo(filename):
 def info_arquivo(filename):
     """Obtém informações sobre um arquivo"""
     try:
-        caminho_arquivo = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        caminho, _ = localizar_anexo(filename)
+        caminho_arquivo = os.path.join(current_app.config['UPLOAD_FOLDER'], caminho)
         
         if not os.path.exists(caminho_arquivo):
             return jsonify({'erro': 'Arquivo não encontrado'}), 404
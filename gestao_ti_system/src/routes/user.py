@@ -1,14 +1,28 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import Usuario, db
+from src.utils.campos import consulta_listagem
+from src.utils.carregamento import recarregar
+from src.utils.exportacao import exportar, formato_exportacao
+from src.utils.paginacao import ParametroInvalido
+from src.utils.versoes import com_etag
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/usuarios', methods=['GET'])
+@com_etag('usuarios')
 def listar_usuarios():
     """Lista todos os usuários ativos"""
     try:
-        usuarios = Usuario.query.filter_by(ativo=True).all()
-        return jsonify([usuario.to_dict() for usuario in usuarios]), 200
+        query, serializar = consulta_listagem(Usuario.query, 'usuario')
+        query = query.filter_by(ativo=True)
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Usuario.nome), serializar, 'usuario', 'usuarios')
+        
+        usuarios = query.all()
+        return jsonify([serializar(usuario) for usuario in usuarios]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -33,12 +47,13 @@ def criar_usuario():
         db.session.add(usuario)
         db.session.commit()
         
-        return jsonify(usuario.to_dict()), 201
+        return jsonify(recarregar(usuario).to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 @user_bp.route('/usuarios/<int:usuario_id>', methods=['GET'])
+@com_etag('usuarios')
 def obter_usuario(usuario_id):
     """Obtém um usuário específico"""
     try:
@@ -64,7 +79,7 @@ def atualizar_usuario(usuario_id):
         
         db.session.commit()
         
-        return jsonify(usuario.to_dict()), 200
+        return jsonify(recarregar(usuario).to_dict()), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
@@ -101,14 +116,23 @@ def login():
         return jsonify({'erro': str(e)}), 500
 
 @user_bp.route('/usuarios/tecnicos', methods=['GET'])
+@com_etag('usuarios')
 def listar_tecnicos():
     """Lista usuários com perfil técnico ou admin"""
     try:
-        tecnicos = Usuario.query.filter(
+        query, serializar = consulta_listagem(Usuario.query, 'usuario')
+        query = query.filter(
             Usuario.perfil.in_(['tecnico', 'admin', 'superadmin']),
             Usuario.ativo == True
-        ).all()
-        return jsonify([tecnico.to_dict() for tecnico in tecnicos]), 200
+        )
+        
+        if formato_exportacao():
+            return exportar(query.order_by(Usuario.nome), serializar, 'usuario', 'tecnicos')
+        
+        tecnicos = query.all()
+        return jsonify([serializar(tecnico) for tecnico in tecnicos]), 200
+    except ParametroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -149,7 +173,7 @@ def atualizar_perfil():
         
         return jsonify({
             'mensagem': 'Perfil atualizado com sucesso',
-            'usuario': usuario.to_dict()
+            'usuario': recarregar(usuario).to_dict()
         }), 200
         
     except Exception as e:
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.chamado import Chamado
+from src.models.compra import Compra
+from src.models.conta_mensal import ContaMensal
+
+TAMANHO_BLOCO = 64 * 1024
+DIRETORIO_OBJETOS = 'objetos'
+
+# nome_arquivo devolvido pelo upload: "<sha256>_<nome original>". Nomes
+# antigos ("<uuid>_<nome>") continuam apontando para UPLOAD_FOLDER.
+PADRAO_NOME = re.compile(r'^([0-9a-f]{64})_(.+)$')
+
+# Campos que guardam o nome_arquivo de um upload
+CAMPOS_ANEXO = {
+    Compra: ('anexo_pedido', 'anexo_nota_fiscal', 'anexo_boleto'),
+    Chamado: ('anexo_evidencia',),
+    ContaMensal: ('anexo_contrato',),
+}
+
+_REGISTRAR = text(
+    'INSERT INTO anexos (sha256, tamanho, caminho, referencias, data_criacao, ultimo_envio) '
+    'VALUES (:sha256, :tamanho, :caminho, 0, :agora, :agora) '
+    'ON CONFLICT (sha256) DO UPDATE SET ultimo_envio = :agora'
+)
+
+_AJUSTAR_REFERENCIAS = text(
+    'UPDATE anexos SET referencias = referencias + :delta WHERE sha256 = :sha256'
+)
+
+# Um único DELETE: um anexo que ganhar referência (ou for reenviado) ao
+# mesmo tempo deixa de satisfazer o WHERE e não é apagado
+_REMOVER_ORFAOS = text(
+    'DELETE FROM anexos WHERE referencias <= 0 AND ultimo_envio < :limite '
+    'RETURNING sha256, caminho'
+)
+
+_EM_USO = text('SELECT 1 FROM anexos WHERE sha256 = :sha256')
+
+_TRAVAR = text('SELECT pg_advisory_xact_lock(hashtext(:sha256))')
+
+
+def caminho_objeto(sha256):
+    """Caminho (relativo a UPLOAD_FOLDER) do conteúdo, dividido em dois
+    níveis de diretório para nenhum deles crescer demais"""
+    return os.path.join(DIRETORIO_OBJETOS, sha256[:2], sha256[2:4], sha256)
+
+
+def _travar_conteudo(sha256):
+    """Trava o conteúdo até o fim da transação (PostgreSQL). Upload e
+    limpeza do mesmo SHA-256 passam a ser serializados: a limpeza só
+    apaga o arquivo se, com a trava, nenhuma linha do catálogo o usa, e o
+    upload só move o arquivo para o lugar depois de registrar a linha."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(_TRAVAR, {'sha256': sha256})
+
+
+def salvar_anexo(arquivo):
+    """Grava o arquivo enviado no armazenamento por conteúdo.
+
+    Lê em blocos, calculando o SHA-256 enquanto copia para um arquivo
+    temporário, que passa a ser o arquivo do conteúdo (um por SHA-256).
+    Registra o anexo na sessão (quem chama faz o commit, que libera a
+    trava do conteúdo) e devolve ``(sha256, tamanho, duplicado)``.
+    """
+    pasta = current_app.config['UPLOAD_FOLDER']
+    temporarios = os.path.join(pasta, DIRETORIO_OBJETOS, 'tmp')
+    os.makedirs(temporarios, exist_ok=True)
+    
+    resumo = hashlib.sha256()
+    tamanho = 0
+    descritor, temporario = tempfile.mkstemp(dir=temporarios)
+    try:
+        with os.fdopen(descritor, 'wb') as destino:
+            while True:
+                bloco = arquivo.stream.read(TAMANHO_BLOCO)
+                if not bloco:
+                    break
+                resumo.update(bloco)
+                tamanho += len(bloco)
+                destino.write(bloco)
+        
+        sha256 = resumo.hexdigest()
+        relativo = caminho_objeto(sha256)
+        _travar_conteudo(sha256)
+        db.session.execute(_REGISTRAR, {
+            'sha256': sha256,
+            'tamanho': tamanho,
+            'caminho': relativo,
+            'agora': datetime.utcnow()
+        })
+        
+        final = os.path.join(pasta, relativo)
+        duplicado = os.path.exists(final)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        # Rename atômico com o mesmo conteúdo: envios simultâneos não conflitam
+        os.replace(temporario, final)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return sha256, tamanho, duplicado
+
+
+def localizar_anexo(nome_arquivo):
+    """(caminho relativo a UPLOAD_FOLDER, nome original ou None) de um
+    nome_arquivo, novo (por conteúdo) ou antigo"""
+    correspondencia = PADRAO_NOME.match(nome_arquivo)
+    if correspondencia is None:
+        return nome_arquivo, None
+    return caminho_objeto(correspondencia.group(1)), correspondencia.group(2)
+
+
+def _sha256_do_nome(valor):
+    correspondencia = PADRAO_NOME.match(valor) if isinstance(valor, str) else None
+    return correspondencia.group(1) if correspondencia else None
+
+
+def _antes_do_flush(session, contexto_flush, instancias):
+    deltas = Counter()
+    for objeto in session.new:
+        for campo in CAMPOS_ANEXO.get(type(objeto), ()):
+            sha256 = _sha256_do_nome(getattr(objeto, campo))
+            if sha256:
+                deltas[sha256] += 1
+    for objeto in session.dirty:
+        for campo in CAMPOS_ANEXO.get(type(objeto), ()):
+            historico = inspect(objeto).attrs[campo].history
+            if not historico.has_changes():
+                continue
+            for valor in historico.added:
+                sha256 = _sha256_do_nome(valor)
+                if sha256:
+                    deltas[sha256] += 1
+            for valor in historico.deleted:
+                sha256 = _sha256_do_nome(valor)
+                if sha256:
+                    deltas[sha256] -= 1
+    for objeto in session.deleted:
+        for campo in CAMPOS_ANEXO.get(type(objeto), ()):
+            historico = inspect(objeto).attrs[campo].history
+            for valor in (*historico.unchanged, *historico.deleted):
+                sha256 = _sha256_do_nome(valor)
+                if sha256:
+                    deltas[sha256] -= 1
+    # Em ordem, para transações concorrentes travarem as linhas na mesma sequência
+    for sha256 in sorted(deltas):
+        if deltas[sha256]:
+            session.execute(_AJUSTAR_REFERENCIAS, {'sha256': sha256, 'delta': deltas[sha256]})
+
+
+def remover_anexos_orfaos(idade):
+    """Apaga os anexos sem referência enviados há mais de ``idade``
+    (catálogo e arquivos); devolve quantos foram removidos"""
+    removidos = db.session.execute(_REMOVER_ORFAOS, {'limite': datetime.utcnow() - idade}).all()
+    db.session.commit()
+    pasta = current_app.config['UPLOAD_FOLDER']
+    for sha256, relativo in removidos:
+        _travar_conteudo(sha256)
+        # Reenviado depois do DELETE: o arquivo voltou a ser usado
+        if not db.session.execute(_EM_USO, {'sha256': sha256}).first():
+            try:
+                os.remove(os.path.join(pasta, relativo))
+            except FileNotFoundError:
+                pass
+        db.session.commit()
+    return len(removidos)
+
+
+def registrar_anexos(app):
+    """Mantém a contagem de referências dos anexos e registra o comando
+    ``flask limpar-anexos`` (agendar diariamente)"""
+    if not event.contains(Session, 'before_flush', _antes_do_flush):
+        event.listen(Session, 'before_flush', _antes_do_flush)
+
+    @app.cli.command('limpar-anexos')
+    def limpar_anexos_comando():
+        """Apaga os anexos enviados que não estão em uso"""
+        horas = app.config.get('ANEXOS_ORFAOS_HORAS', 24)
+        total = remover_anexos_orfaos(timedelta(hours=horas))
+        click.echo(f'{total} anexo(s) sem uso removido(s)')
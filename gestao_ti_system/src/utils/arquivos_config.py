@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
+
+# Entre duas revalidações o conteúdo em memória é usado sem olhar o disco
+INTERVALO_REVALIDACAO = 0.5
+
+
+class ArquivoConfig:
+    """Arquivo JSON de src/config/ lido uma vez por processo.
+
+    A cada INTERVALO_REVALIDACAO segundos, no máximo, um ``os.stat``
+    confere se o arquivo mudou (mtime, tamanho e inode) e só então ele é
+    lido de novo; assim todos os workers enxergam uma configuração salva
+    por qualquer um deles em menos de um segundo. ``gravar`` escreve num
+    arquivo temporário e o renomeia, para que ninguém leia o JSON pela
+    metade.
+    """
+
+    def __init__(self, nome):
+        self.caminho = os.path.join(CONFIG_DIR, nome)
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._dados = None
+        self._verificado_em = None
+
+    def _assinatura_arquivo(self):
+        try:
+            info = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return info.st_mtime_ns, info.st_size, info.st_ino
+
+    def ler(self):
+        """Cópia do conteúdo do arquivo, ou None se ele não existe ou é inválido"""
+        with self._lock:
+            agora = time.monotonic()
+            if self._verificado_em is None or agora - self._verificado_em >= INTERVALO_REVALIDACAO:
+                assinatura = self._assinatura_arquivo()
+                if assinatura != self._assinatura:
+                    self._dados = self._carregar() if assinatura is not None else None
+                    self._assinatura = assinatura
+                self._verificado_em = agora
+            return dict(self._dados) if self._dados is not None else None
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar {self.caminho}: {e}")
+            return None
+
+    def gravar(self, dados, **opcoes_json):
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=CONFIG_DIR, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'w') as f:
+                json.dump(dados, f, **opcoes_json)
+            os.replace(temporario, self.caminho)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        with self._lock:
+            # Próxima leitura revalida (e relê o que acabou de ser gravado)
+            self._verificado_em = None
+
+
+config_smtp = ArquivoConfig('smtp.json')
+config_logo = ArquivoConfig('logo.json')
@@ -0,0 +1,118 @@
+import click
+from sqlalchemy import Text, cast, func, select, update
+from sqlalchemy.dialects.postgresql import TSQUERY
+from src.models.user import db
+from src.models.chamado import Chamado, HistoricoChamado
+from src.utils.carregamento import com_perfil
+
+CONFIGURACAO_TEXTO = 'portuguese'
+STATUS_RESOLVIDOS = ('resolvido', 'fechado')
+# Opções do ts_headline: trechos curtos com os termos encontrados marcados
+OPCOES_DESTAQUE = 'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2'
+
+
+def _vetor(texto, peso):
+    return func.setweight(func.to_tsvector(CONFIGURACAO_TEXTO, func.coalesce(texto, '')), peso)
+
+
+def expressao_documento_busca():
+    """tsvector do chamado: título e solução (peso A), descrição (B) e
+    descrições do histórico (C)"""
+    historico = (
+        select(func.string_agg(HistoricoChamado.descricao, ' '))
+        .where(HistoricoChamado.chamado_id == Chamado.id)
+        .scalar_subquery()
+    )
+    return (
+        _vetor(Chamado.titulo, 'A')
+        .op('||')(_vetor(Chamado.solucao, 'A'))
+        .op('||')(_vetor(Chamado.descricao, 'B'))
+        .op('||')(_vetor(historico, 'C'))
+    )
+
+
+def atualizar_documento_busca(chamado_id=None):
+    """Recalcula chamados.documento_busca de um chamado (ou de todos).
+
+    Chamado pelas rotas sempre que título, descrição, solução ou histórico
+    mudam, antes do commit. Sem efeito fora do PostgreSQL.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return 0
+    stmt = update(Chamado).values(documento_busca=expressao_documento_busca())
+    if chamado_id is not None:
+        stmt = stmt.where(Chamado.id == chamado_id)
+    return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
+
+
+def _consulta_termos(q):
+    """tsquery com todos os termos (sintaxe de busca web: "frase", -termo, or)"""
+    return func.websearch_to_tsquery(CONFIGURACAO_TEXTO, q)
+
+
+def _consulta_qualquer_termo(texto):
+    """tsquery que aceita qualquer um dos termos (OR), para similaridade"""
+    termos = cast(func.plainto_tsquery(CONFIGURACAO_TEXTO, texto), Text)
+    return cast(func.replace(termos, '&', '|'), TSQUERY)
+
+
+def _destaque(texto, consulta):
+    return func.ts_headline(CONFIGURACAO_TEXTO, func.coalesce(texto, ''), consulta, OPCOES_DESTAQUE)
+
+
+def buscar_chamados(q, limite, status=None, similares=False, excluir_id=None):
+    """Busca textual ranqueada nos chamados.
+
+    Com ``similares`` o texto de ``q`` é tratado como referência: a busca
+    aceita qualquer um dos termos e fica restrita aos chamados resolvidos ou fechados com solução, para
+    uso como base de conhecimento. O GIN em documento_busca resolve o
+    filtro @@; o ts_headline (caro) é calculado pelo PostgreSQL só para as
+    linhas que sobram após o ORDER BY/LIMIT.
+    """
+    if similares:
+        consulta = _consulta_qualquer_termo(q)
+    else:
+        consulta = _consulta_termos(q)
+
+    relevancia = func.ts_rank_cd(Chamado.documento_busca, consulta).label('relevancia')
+    query = (
+        com_perfil(db.session.query(
+            Chamado,
+            relevancia,
+            _destaque(Chamado.titulo, consulta).label('destaque_titulo'),
+            _destaque(Chamado.descricao, consulta).label('destaque_descricao'),
+            _destaque(Chamado.solucao, consulta).label('destaque_solucao')
+        ), 'chamado_lista')
+        .filter(Chamado.documento_busca.op('@@')(consulta))
+    )
+    if similares:
+        query = query.filter(Chamado.status.in_(STATUS_RESOLVIDOS), Chamado.solucao.isnot(None))
+    elif status:
+        query = query.filter(Chamado.status == status)
+    if excluir_id is not None:
+        query = query.filter(Chamado.id != excluir_id)
+
+    linhas = query.order_by(relevancia.desc(), Chamado.id.desc()).limit(limite).all()
+    return [
+        {
+            'chamado': chamado.to_dict(),
+            'relevancia': round(float(valor), 6),
+            'destaques': {
+                'titulo': titulo,
+                'descricao': descricao,
+                'solucao': solucao if chamado.solucao else None
+            }
+        }
+        for chamado, valor, titulo, descricao, solucao in linhas
+    ]
+
+
+def registrar_reindexacao_busca(app):
+    """Registra o comando ``flask reindexar-busca-chamados`` (carga inicial)"""
+
+    @app.cli.command('reindexar-busca-chamados')
+    def reindexar_busca_chamados_comando():
+        """Recalcula o documento de busca de todos os chamados"""
+        total = atualizar_documento_busca()
+        db.session.commit()
+        click.echo(f'{total} chamado(s) reindexado(s)')
@@ -0,0 +1,135 @@
+import re
+import unicodedata
+from sqlalchemy import func, literal, or_, select, union_all
+from src.models.user import db, Usuario
+from src.models.ativo import Ativo
+from src.models.compra import Compra
+from src.models.fornecedor import Fornecedor
+from src.utils.paginacao import ParametroInvalido
+
+TAMANHO_MINIMO_TERMO = 2
+LIMITE_POR_TIPO_PADRAO = 5
+LIMITE_POR_TIPO_MAXIMO = 20
+
+
+def normalizar_texto(valor):
+    """Minúsculas e sem acentos; equivalente à função SQL normalizar_texto()"""
+    decomposto = unicodedata.normalize('NFKD', valor)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower().strip()
+
+
+def somente_digitos(valor):
+    """Apenas os dígitos; equivalente à função SQL somente_digitos()"""
+    return re.sub(r'\D', '', valor)
+
+
+def _chave_texto(coluna):
+    return func.normalizar_texto(coluna), normalizar_texto
+
+
+def _chave_digitos(coluna):
+    return func.somente_digitos(coluna), somente_digitos
+
+
+class FonteBusca:
+    """Entidade pesquisável na busca global.
+
+    ``chaves`` são pares (expressão SQL indexada com gin_trgm_ops, função
+    que normaliza o termo do mesmo jeito); ``filtro`` restringe aos
+    registros que fazem sentido sugerir.
+    """
+
+    def __init__(self, modelo, titulo, subtitulo, chaves, filtro=None):
+        self.modelo = modelo
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+        self.chaves = chaves
+        self.filtro = filtro
+
+    def consulta(self, tipo, termo, limite):
+        """SELECT dos melhores candidatos desta fonte, ou None se nenhuma
+        chave se aplica ao termo (ex.: termo sem dígitos para o CNPJ)"""
+        condicoes = []
+        relevancias = []
+        for expressao, normalizar in self.chaves:
+            termo_chave = normalizar(termo)
+            if len(termo_chave) < TAMANHO_MINIMO_TERMO:
+                continue
+            # termo <% chave: alguma palavra da chave é parecida com o termo
+            # (usa o índice GIN trigram; tolera erros de digitação)
+            condicoes.append(literal(termo_chave).op('<%')(expressao))
+            condicoes.append(expressao.startswith(termo_chave, autoescape=True))
+            relevancias.append(func.word_similarity(termo_chave, expressao))
+        if not condicoes:
+            return None
+
+        relevancia = relevancias[0] if len(relevancias) == 1 else func.greatest(*relevancias)
+        consulta = select(
+            literal(tipo).label('tipo'),
+            self.modelo.id.label('id'),
+            self.titulo.label('titulo'),
+            self.subtitulo.label('subtitulo'),
+            relevancia.label('relevancia')
+        ).where(or_(*condicoes))
+        if self.filtro is not None:
+            consulta = consulta.where(self.filtro)
+        return consulta.order_by(relevancia.desc()).limit(limite)
+
+
+FONTES_BUSCA = {
+    'fornecedor': FonteBusca(
+        Fornecedor, Fornecedor.nome, Fornecedor.cnpj,
+        chaves=[_chave_texto(Fornecedor.nome), _chave_digitos(Fornecedor.cnpj)],
+        filtro=Fornecedor.ativo.is_(True)
+    ),
+    'ativo': FonteBusca(
+        Ativo, Ativo.nome, Ativo.numero_serie,
+        chaves=[_chave_texto(Ativo.nome), _chave_texto(Ativo.numero_serie)],
+        filtro=Ativo.status == 'ativo'
+    ),
+    'usuario': FonteBusca(
+        Usuario, Usuario.nome, Usuario.email,
+        chaves=[_chave_texto(Usuario.nome), _chave_texto(Usuario.email)],
+        filtro=Usuario.ativo.is_(True)
+    ),
+    'compra': FonteBusca(
+        Compra, Compra.numero_pedido, Compra.status,
+        chaves=[_chave_texto(Compra.numero_pedido)]
+    ),
+}
+
+
+def buscar_global(termo, tipos=None, limite_por_tipo=LIMITE_POR_TIPO_PADRAO):
+    """Busca tolerante a erros nas entidades de FONTES_BUSCA.
+
+    Todas as fontes vão em um único UNION ALL (uma ida ao banco), cada uma
+    com seu próprio LIMIT; o resultado vem ordenado pela relevância.
+    """
+    tipos = tipos or list(FONTES_BUSCA)
+    invalidos = [tipo for tipo in tipos if tipo not in FONTES_BUSCA]
+    if invalidos:
+        raise ParametroInvalido(f'Tipo(s) inválido(s): {", ".join(invalidos)}')
+
+    termo = termo.strip()
+    consultas = [
+        consulta for consulta in (
+            FONTES_BUSCA[tipo].consulta(tipo, termo, limite_por_tipo) for tipo in tipos
+        ) if consulta is not None
+    ]
+    if not consultas:
+        return []
+
+    resultados = union_all(*[select(consulta.subquery()) for consulta in consultas]).subquery()
+    linhas = db.session.execute(
+        select(resultados).order_by(resultados.c.relevancia.desc(), resultados.c.tipo, resultados.c.id)
+    ).all()
+    return [
+        {
+            'tipo': linha.tipo,
+            'id': linha.id,
+            'titulo': linha.titulo,
+            'subtitulo': linha.subtitulo,
+            'relevancia': round(float(linha.relevancia), 4)
+        }
+        for linha in linhas
+    ]
@@ -0,0 +1,236 @@
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from src.models.user import db
+from src.models.email_pendente import EmailPendente
+from src.utils.email_service import email_service
+
+# Teto do intervalo entre tentativas de um mesmo email (segundos)
+ATRASO_MAXIMO = 3600
+# Conexão parada há mais que isso é testada com NOOP antes de ser reutilizada
+OCIOSIDADE_NOOP = 30
+# e fechada se ficar parada mais que isso
+OCIOSIDADE_MAXIMA = 120
+
+
+def enfileirar_email(destinatario, assunto, texto, html=None):
+    """Adiciona um email à caixa de saída na sessão atual.
+
+    Quem chama faz o commit (o email só existe se a transação da
+    requisição for gravada) e pode chamar entregador_emails.acordar()
+    para que ele saia sem esperar o próximo ciclo.
+    """
+    email = EmailPendente(
+        destinatario=destinatario,
+        assunto=assunto,
+        corpo_texto=texto,
+        corpo_html=html,
+        proxima_tentativa=datetime.utcnow()
+    )
+    db.session.add(email)
+    return email
+
+
+def _erro_conexao(erro):
+    """Erro da conexão em si (queda, timeout, rede), e não uma resposta
+    do servidor; SMTPException também é OSError"""
+    if isinstance(erro, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(erro, OSError) and not isinstance(erro, smtplib.SMTPException)
+
+
+def _falha_permanente(erro):
+    """Destinatário recusado ou resposta 5xx do servidor: não adianta repetir.
+    Falha de autenticação é tratada como temporária (a configuração pode
+    ser corrigida)."""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(erro, smtplib.SMTPAuthenticationError):
+        return False
+    codigo = getattr(erro, 'smtp_code', None)
+    return isinstance(codigo, int) and 500 <= codigo < 600
+
+
+class EntregadorEmails:
+    """Envia os emails de emails_pendentes reaproveitando uma conexão SMTP
+    autenticada entre os envios.
+
+    Cada lote trava as linhas com FOR UPDATE SKIP LOCKED, então vários
+    workers (ou o comando `flask enviar-emails`) podem rodar ao mesmo tempo
+    sem enviar o mesmo email duas vezes. Falhas temporárias são repetidas
+    com espera exponencial (EMAIL_ATRASO_BASE * 2^(tentativas-1), até
+    ATRASO_MAXIMO); após EMAIL_MAX_TENTATIVAS, ou em falha permanente, o
+    email fica com status 'falhou' e o erro em ultimo_erro.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._servidor = None
+        self._config_servidor = None
+        self._ultimo_uso = 0.0
+
+    def _descartar_conexao(self):
+        servidor, self._servidor = self._servidor, None
+        if servidor is not None:
+            try:
+                servidor.close()
+            except Exception:
+                pass
+
+    def fechar_conexao(self):
+        if self._servidor is not None:
+            try:
+                self._servidor.quit()
+            except Exception:
+                pass
+        self._descartar_conexao()
+
+    def _conexao(self):
+        """Conexão SMTP pronta para enviar: reaproveita a atual se ainda
+        responde e a configuração não mudou; senão abre outra"""
+        if self._servidor is not None:
+            ocioso = time.monotonic() - self._ultimo_uso
+            if email_service.config != self._config_servidor or ocioso > OCIOSIDADE_MAXIMA:
+                self.fechar_conexao()
+            elif ocioso > OCIOSIDADE_NOOP:
+                try:
+                    if self._servidor.noop()[0] != 250:
+                        self.fechar_conexao()
+                except OSError:
+                    self._descartar_conexao()
+        if self._servidor is None:
+            self._servidor = email_service.conectar()
+            self._config_servidor = dict(email_service.config)
+        self._ultimo_uso = time.monotonic()
+        return self._servidor
+
+    def _registrar_falha(self, email, erro, config):
+        email.tentativas += 1
+        email.ultimo_erro = str(erro)[:1000]
+        if _falha_permanente(erro) or email.tentativas >= config.get('EMAIL_MAX_TENTATIVAS', 6):
+            email.status = 'falhou'
+            print(f"Email {email.id} para {email.destinatario} não enviado: {erro}")
+            return
+        atraso = min(config.get('EMAIL_ATRASO_BASE', 30) * 2 ** (email.tentativas - 1), ATRASO_MAXIMO)
+        email.proxima_tentativa = datetime.utcnow() + timedelta(seconds=atraso)
+
+    def processar_lote(self):
+        """Envia um lote de emails vencidos e grava o resultado; devolve
+        quantos foram processados (enviados ou com falha registrada)"""
+        config = current_app.config
+        with self._lock:
+            if not email_service.is_configured():
+                self.fechar_conexao()
+                return 0
+
+            emails = EmailPendente.query.filter(
+                EmailPendente.status == 'pendente',
+                EmailPendente.proxima_tentativa <= datetime.utcnow()
+            ).order_by(EmailPendente.id).limit(config.get('EMAIL_LOTE', 20)).with_for_update(skip_locked=True).all()
+            if not emails:
+                db.session.rollback()
+                return 0
+
+            for indice, email in enumerate(emails):
+                try:
+                    servidor = self._conexao()
+                except Exception as e:
+                    # Sem conexão nenhum email do lote sai agora
+                    for restante in emails[indice:]:
+                        self._registrar_falha(restante, e, config)
+                    break
+                try:
+                    servidor.send_message(email_service.montar_mensagem(
+                        email.destinatario, email.assunto, email.corpo_texto, email.corpo_html
+                    ))
+                    email.status = 'enviado'
+                    email.data_envio = datetime.utcnow()
+                    email.ultimo_erro = None
+                except Exception as e:
+                    if _erro_conexao(e):
+                        self._descartar_conexao()
+                    self._registrar_falha(email, e, config)
+
+            db.session.commit()
+            return len(emails)
+
+    def esvaziar(self):
+        """Processa lotes até não haver mais emails vencidos"""
+        total = 0
+        lote = current_app.config.get('EMAIL_LOTE', 20)
+        while True:
+            processados = self.processar_lote()
+            total += processados
+            if processados < lote:
+                return total
+
+    def executar(self, app):
+        """Laço de entrega: esvazia a fila a cada EMAIL_INTERVALO segundos
+        ou quando acordado"""
+        intervalo = app.config.get('EMAIL_INTERVALO', 5)
+        while True:
+            with app.app_context():
+                try:
+                    self.esvaziar()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Erro no entregador de emails: {e}")
+            if self._servidor is not None and time.monotonic() - self._ultimo_uso > OCIOSIDADE_MAXIMA:
+                with self._lock:
+                    self.fechar_conexao()
+            self._acordar.wait(intervalo)
+            self._acordar.clear()
+
+    def iniciar(self, app):
+        """Inicia a thread de entrega deste processo, se ainda não estiver
+        rodando (após o fork de cada worker a thread do pai não existe)"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock_thread:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            # Conexão herdada do processo pai não pode ser compartilhada
+            self._servidor = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self.executar, args=(app,), name='entregador-emails', daemon=True
+            )
+            self._thread.start()
+
+    def acordar(self):
+        self._acordar.set()
+
+
+entregador_emails = EntregadorEmails()
+
+
+def registrar_caixa_saida(app):
+    """Entrega da caixa de saída de emails.
+
+    Com EMAIL_ENTREGADOR_EMBUTIDO cada worker inicia a própria thread de
+    entrega na primeira requisição. Sem ela, rode o entregador como
+    processo separado com `flask enviar-emails` (ou `--uma-vez` no cron).
+    """
+    if app.config.get('EMAIL_ENTREGADOR_EMBUTIDO', True):
+        @app.before_request
+        def iniciar_entregador_emails():
+            entregador_emails.iniciar(app)
+
+    @app.cli.command('enviar-emails')
+    @click.option('--uma-vez', is_flag=True, help='Envia os emails vencidos e sai')
+    def enviar_emails_comando(uma_vez):
+        """Envia os emails da caixa de saída"""
+        if uma_vez:
+            total = entregador_emails.esvaziar()
+            entregador_emails.fechar_conexao()
+            click.echo(f'{total} email(s) processado(s)')
+            return
+        entregador_emails.executar(current_app._get_current_object())
@@ -0,0 +1,260 @@
+from flask import request
+from sqlalchemy.orm import aliased, joinedload, load_only
+from src.models.user import Usuario
+from src.models.ativo import Ativo
+from src.models.centro_custo import CentroCusto
+from src.models.chamado import Chamado
+from src.models.compra import Compra
+from src.models.conta_mensal import ContaMensal
+from src.models.fornecedor import Fornecedor
+from src.models.inventario import Inventario
+from src.utils.carregamento import PERFIS_CARREGAMENTO, com_perfil
+from src.utils.paginacao import ParametroInvalido
+
+
+class Recurso:
+    """Descreve os campos serializáveis de um modelo nas listagens.
+
+    ``derivados`` mapeia campos calculados para (função, colunas das quais
+    o cálculo depende); ``relacoes`` são os objetos aninhados que podem ser
+    pedidos via ``expand``.
+    """
+
+    def __init__(self, modelo, relacoes=(), derivados=None, ocultos=()):
+        self.modelo = modelo
+        self.relacoes = tuple(relacoes)
+        self.derivados = derivados or {}
+        self.colunas = [
+            coluna.key for coluna in modelo.__mapper__.column_attrs
+            if coluna.key not in ocultos and coluna.key not in self.derivados
+        ]
+
+    @property
+    def campos(self):
+        return self.colunas + list(self.derivados)
+
+
+RECURSOS = {
+    'ativo': Recurso(Ativo, relacoes=('responsavel', 'centro_custo')),
+    'compra': Recurso(Compra, relacoes=('fornecedor', 'centro_custo', 'usuario_solicitante')),
+    'chamado': Recurso(Chamado, relacoes=('solicitante', 'tecnico_atribuido'), ocultos=('documento_busca',)),
+    'conta_mensal': Recurso(
+        ContaMensal,
+        relacoes=('fornecedor', 'centro_custo'),
+        derivados={
+            'vencida': (
+                lambda conta: conta.verificar_vencimento(),
+                ('data_vencimento', 'status_pagamento')
+            )
+        }
+    ),
+    'inventario': Recurso(
+        Inventario,
+        relacoes=('centro_custo', 'fornecedor'),
+        derivados={
+            'estoque_baixo': (
+                lambda item: item.verificar_estoque_minimo(),
+                ('quantidade', 'quantidade_minima')
+            )
+        }
+    ),
+    'centro_custo': Recurso(CentroCusto),
+    'fornecedor': Recurso(Fornecedor),
+    'usuario': Recurso(Usuario, ocultos=('senha',)),
+}
+
+RECURSOS_POR_MODELO = {recurso.modelo: recurso for recurso in RECURSOS.values()}
+
+
+class LeituraColunas:
+    """Leitura das listagens completas sem instanciar objetos do ORM.
+
+    Seleciona só as colunas que o to_dict() do modelo serializa, mais as
+    das relações (LEFT JOIN, um alias por relação), e monta o mesmo dict a
+    partir de cada linha (Row, uma tupla nomeada). Não há identity map,
+    estado de atributos nem lazy loading. Só serve para recursos sem
+    campos derivados, que dependem de métodos do modelo.
+    """
+
+    def __init__(self, recurso):
+        self.recurso = recurso
+        self.relacoes = []
+        for relacao in recurso.relacoes:
+            modelo = getattr(recurso.modelo, relacao).property.mapper.class_
+            self.relacoes.append((relacao, RECURSOS_POR_MODELO[modelo], aliased(modelo, name=relacao)))
+
+        # Fatias (relação, chaves, início, fim, posição do id) de cada
+        # objeto aninhado dentro da linha
+        self._fatias = []
+        inicio = len(recurso.colunas)
+        for relacao, relacionado, _ in self.relacoes:
+            fim = inicio + len(relacionado.colunas)
+            self._fatias.append((relacao, relacionado.colunas, inicio, fim, inicio + relacionado.colunas.index('id')))
+            inicio = fim
+
+    @staticmethod
+    def suportado(recurso):
+        if recurso.derivados:
+            return False
+        for relacao in recurso.relacoes:
+            modelo = getattr(recurso.modelo, relacao).property.mapper.class_
+            if RECURSOS_POR_MODELO[modelo].derivados:
+                return False
+        return True
+
+    def aplicar(self, query):
+        """Troca as entidades da consulta pelas colunas serializadas.
+
+        As colunas do modelo mantêm o nome do atributo (o cursor da
+        paginação lê ``linha.<coluna>``); as das relações recebem o
+        prefixo ``relacao__``. Filtros devem usar ``filter(Modelo.coluna
+        == valor)``: depois dos joins, filter_by() se aplicaria ao último
+        alias.
+        """
+        modelo = self.recurso.modelo
+        colunas = [getattr(modelo, nome) for nome in self.recurso.colunas]
+        for relacao, relacionado, alias in self.relacoes:
+            colunas.extend(getattr(alias, nome).label(f'{relacao}__{nome}') for nome in relacionado.colunas)
+        query = query.with_entities(*colunas)
+        for relacao, _, alias in self.relacoes:
+            query = query.outerjoin(getattr(modelo, relacao).of_type(alias))
+        return query
+
+    def serializador(self):
+        """Função que converte uma linha no dict do to_dict().
+
+        Como o identity map faria, cada objeto relacionado é montado uma
+        vez por consulta e o mesmo dict é reutilizado nas linhas seguintes.
+        """
+        colunas = self.recurso.colunas
+        fatias = self._fatias
+        relacionados = {}
+
+        def serializar(linha):
+            resultado = dict(zip(colunas, linha))
+            for relacao, chaves, inicio, fim, posicao_id in fatias:
+                id_ = linha[posicao_id]
+                if id_ is None:
+                    resultado[relacao] = None
+                    continue
+                aninhado = relacionados.get((relacao, id_))
+                if aninhado is None:
+                    aninhado = relacionados[(relacao, id_)] = dict(zip(chaves, linha[inicio:fim]))
+                resultado[relacao] = aninhado
+            return resultado
+
+        return serializar
+
+LEITURAS_COLUNAS = {
+    nome: LeituraColunas(recurso)
+    for nome, recurso in RECURSOS.items() if LeituraColunas.suportado(recurso)
+}
+
+
+def _ler_lista(nome):
+    valor = request.args.get(nome, '')
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+class Projecao:
+    """Campos e relações pedidos via ?fields= e ?expand= para um recurso"""
+
+    def __init__(self, recurso, campos, expandir):
+        self.recurso = recurso
+        self.campos = campos
+        self.expandir = expandir
+
+    def aplicar(self, query, *colunas_extras):
+        """Restringe o SELECT às colunas necessárias e carrega só as relações pedidas"""
+        modelo = self.recurso.modelo
+        necessarias = {'id'}
+        for campo in self.campos:
+            if campo in self.recurso.derivados:
+                necessarias.update(self.recurso.derivados[campo][1])
+            else:
+                necessarias.add(campo)
+        necessarias.update(coluna.key for coluna in colunas_extras)
+
+        opcoes = [load_only(*[getattr(modelo, nome) for nome in self.recurso.colunas if nome in necessarias])]
+        for relacao in self.expandir:
+            opcoes.append(joinedload(getattr(modelo, relacao)))
+        return query.options(*opcoes)
+
+    def serializar(self, objeto):
+        resultado = {}
+        for campo in self.campos:
+            if campo in self.recurso.derivados:
+                resultado[campo] = self.recurso.derivados[campo][0](objeto)
+            else:
+                resultado[campo] = getattr(objeto, campo)
+        for relacao in self.expandir:
+            relacionado = getattr(objeto, relacao)
+            resultado[relacao] = relacionado.to_dict() if relacionado else None
+        return resultado
+
+    def campos_expandidos(self):
+        """Pares (relação, campos do to_dict() do objeto relacionado)"""
+        for relacao in self.expandir:
+            modelo = getattr(self.recurso.modelo, relacao).property.mapper.class_
+            yield relacao, RECURSOS_POR_MODELO[modelo].campos
+
+    def cabecalho_csv(self):
+        """Colunas da exportação CSV; relações expandidas viram relacao.campo"""
+        cabecalho = list(self.campos)
+        for relacao, campos in self.campos_expandidos():
+            cabecalho.extend(f'{relacao}.{campo}' for campo in campos)
+        return cabecalho
+
+
+def ler_projecao(nome_recurso):
+    """Interpreta ?fields= e ?expand= da requisição.
+
+    Retorna None quando nenhum dos dois foi informado (resposta completa,
+    como antes). Caso contrário a resposta é plana por padrão: só os campos
+    pedidos (ou todas as colunas) e apenas as relações listadas em expand.
+    A exportação CSV é sempre plana, então sempre usa a projeção.
+    """
+    if ('fields' not in request.args and 'expand' not in request.args
+            and request.args.get('format') != 'csv'):
+        return None
+
+    recurso = RECURSOS[nome_recurso]
+    campos = _ler_lista('fields')
+    expandir = _ler_lista('expand')
+
+    # Relações citadas em fields também são expandidas
+    expandir += [campo for campo in campos if campo in recurso.relacoes and campo not in expandir]
+    if campos:
+        campos = [campo for campo in campos if campo not in recurso.relacoes]
+    else:
+        campos = recurso.campos
+
+    invalidos = [campo for campo in campos if campo not in recurso.campos]
+    if invalidos:
+        raise ParametroInvalido(f'Campo(s) inválido(s): {", ".join(invalidos)}')
+    invalidas = [relacao for relacao in expandir if relacao not in recurso.relacoes]
+    if invalidas:
+        raise ParametroInvalido(f'Relação(ões) inválida(s) para expand: {", ".join(invalidas)}')
+
+    return Projecao(recurso, campos, expandir)
+
+
+def consulta_listagem(query, nome_recurso, *colunas_extras):
+    """Prepara a consulta de uma listagem e o serializador correspondente.
+
+    Sem ?fields=/?expand= devolve a resposta completa: pelas colunas
+    (LeituraColunas) quando o recurso permite, senão com o perfil de
+    carregamento e to_dict(). Com eles, aplica a projeção. ``colunas_extras``
+    são colunas que precisam ser carregadas mesmo fora de fields (ex.:
+    chave do cursor).
+    """
+    projecao = ler_projecao(nome_recurso)
+    if projecao is None:
+        leitura = LEITURAS_COLUNAS.get(nome_recurso)
+        if leitura is not None:
+            return leitura.aplicar(query), leitura.serializador()
+        perfil = f'{nome_recurso}_lista'
+        if perfil in PERFIS_CARREGAMENTO:
+            query = com_perfil(query, perfil)
+        return query, lambda objeto: objeto.to_dict()
+    return projecao.aplicar(query, *colunas_extras), projecao.serializar
@@ -0,0 +1,109 @@
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload, selectinload
+from src.models.user import db
+from src.models.ativo import Ativo
+from src.models.compra import Compra, RateioCompra
+from src.models.chamado import Chamado, HistoricoChamado
+from src.models.conta_mensal import ContaMensal
+from src.models.inventario import Inventario, MovimentacaoInventario
+
+# Perfis de carregamento: para cada endpoint, exatamente os relacionamentos
+# percorridos pelo to_dict() correspondente. Relações muitos-para-um usam
+# joinedload (sem multiplicar linhas); coleções usam selectinload.
+PERFIS_CARREGAMENTO = {
+    'ativo_lista': lambda: (
+        joinedload(Ativo.responsavel),
+        joinedload(Ativo.centro_custo),
+    ),
+    'compra_lista': lambda: (
+        joinedload(Compra.fornecedor),
+        joinedload(Compra.centro_custo),
+        joinedload(Compra.usuario_solicitante),
+    ),
+    'compra_detalhe': lambda: (
+        joinedload(Compra.fornecedor),
+        joinedload(Compra.centro_custo),
+        joinedload(Compra.usuario_solicitante),
+        selectinload(Compra.produtos),
+        selectinload(Compra.rateios).joinedload(RateioCompra.centro_custo),
+    ),
+    'chamado_lista': lambda: (
+        joinedload(Chamado.solicitante),
+        joinedload(Chamado.tecnico_atribuido),
+    ),
+    'chamado_detalhe': lambda: (
+        joinedload(Chamado.solicitante),
+        joinedload(Chamado.tecnico_atribuido),
+        selectinload(Chamado.historico).joinedload(HistoricoChamado.usuario),
+    ),
+    'conta_mensal_lista': lambda: (
+        joinedload(ContaMensal.fornecedor),
+        joinedload(ContaMensal.centro_custo),
+    ),
+    'inventario_lista': lambda: (
+        joinedload(Inventario.centro_custo),
+        joinedload(Inventario.fornecedor),
+    ),
+    'inventario_detalhe': lambda: (
+        joinedload(Inventario.centro_custo),
+        joinedload(Inventario.fornecedor),
+        selectinload(Inventario.movimentacoes).joinedload(MovimentacaoInventario.usuario),
+    ),
+}
+
+
+def com_perfil(query, perfil):
+    """Aplica à consulta as opções de carregamento do perfil informado"""
+    return query.options(*PERFIS_CARREGAMENTO[perfil]())
+
+
+def recarregar(objeto, perfil=None):
+    """Relê do banco, em uma única consulta, um objeto recém-gravado e as
+    relações do perfil usadas pelo to_dict().
+
+    Como o commit não expira os atributos, a resposta das rotas de escrita
+    passa por aqui para refletir os valores gravados (tipos do banco,
+    triggers) sem um lazy load por relação.
+    """
+    modelo = type(objeto)
+    query = db.session.query(modelo).populate_existing()
+    if perfil is not None:
+        query = com_perfil(query, perfil)
+    return query.filter(modelo.id == objeto.id).one()
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Requisição executou mais consultas SQL do que o orçamento configurado"""
+
+
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.total_consultas = g.get('total_consultas', 0) + 1
+
+
+def registrar_orcamento_consultas(app):
+    """Ativa a verificação de orçamento de consultas por requisição.
+
+    Usado em testes: com ORCAMENTO_CONSULTAS > 0, toda requisição que
+    executar mais consultas que o limite levanta OrcamentoConsultasExcedido.
+    ORCAMENTO_CONSULTAS_ENDPOINTS permite limites específicos por endpoint.
+    A configuração é lida a cada requisição, então pode ser alterada em
+    app.config depois de a aplicação ser criada.
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _contar_consulta):
+        event.listen(Engine, 'before_cursor_execute', _contar_consulta)
+
+    @app.after_request
+    def verificar_orcamento_consultas(response):
+        config = current_app.config
+        limite = config.get('ORCAMENTO_CONSULTAS_ENDPOINTS', {}).get(
+            request.endpoint, config.get('ORCAMENTO_CONSULTAS', 0)
+        )
+        total = g.get('total_consultas', 0)
+        if limite and total > limite:
+            raise OrcamentoConsultasExcedido(
+                f'{request.method} {request.path} executou {total} consultas (orçamento: {limite})'
+            )
+        return response
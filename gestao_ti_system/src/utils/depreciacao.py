@@ -0,0 +1,154 @@
+from datetime import date
+import click
+import numpy as np
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import load_only
+from src.models.user import db
+from src.models.ativo import Ativo
+from src.models.centro_custo import CentroCusto
+from src.utils.paginacao import ParametroInvalido
+
+ANOS_PROJECAO_MAXIMO = 30
+AGRUPAMENTOS = ('centro_custo', 'tipo_ativo')
+
+
+def expressao_valor_atual():
+    """Valor atual do ativo calculado no banco (PostgreSQL).
+
+    Mesma regra de Ativo.calcular_depreciacao() e da função SQL
+    calcular_depreciacao do database_schema.sql: depreciação linear por
+    anos completos desde a aquisição, limitada ao valor de aquisição.
+    """
+    anos = func.extract('year', func.age(func.current_date(), Ativo.data_aquisicao))
+    depreciado = Ativo.valor_aquisicao * (func.coalesce(Ativo.percentual_depreciacao, 0) / 100) * anos
+    return case(
+        (Ativo.valor_aquisicao.is_(None), None),
+        (anos <= 0, Ativo.valor_aquisicao),
+        else_=func.greatest(Ativo.valor_aquisicao - depreciado, 0)
+    )
+
+
+def recalcular_valores_atuais():
+    """Recalcula o valor_atual persistido de todos os ativos.
+
+    No PostgreSQL é um único UPDATE que só reescreve as linhas cujo valor
+    mudou (ativos que completaram mais um ano desde a última execução).
+    Em outros bancos calcula em Python e grava com um UPDATE em lote por
+    chave primária. Retorna o número de ativos atualizados; o commit fica
+    a cargo de quem chama.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        valor = expressao_valor_atual()
+        resultado = db.session.execute(
+            update(Ativo)
+            .where(Ativo.valor_atual.is_distinct_from(valor))
+            # Recalcular não é uma alteração do ativo: evita o onupdate de
+            # data_atualizacao do modelo (o trigger trigger_ativos_update
+            # também ignora updates que só mudam valor_atual)
+            .values(valor_atual=valor, data_atualizacao=Ativo.data_atualizacao),
+            execution_options={'synchronize_session': False}
+        )
+        return resultado.rowcount
+
+    ativos = Ativo.query.options(load_only(
+        Ativo.valor_aquisicao, Ativo.data_aquisicao, Ativo.percentual_depreciacao,
+        Ativo.valor_atual, Ativo.data_atualizacao
+    )).all()
+    alteracoes = []
+    for ativo in ativos:
+        valor = ativo.calcular_depreciacao()
+        if ativo.valor_atual is None or float(ativo.valor_atual) != round(float(valor), 2):
+            alteracoes.append({'id': ativo.id, 'valor_atual': valor, 'data_atualizacao': ativo.data_atualizacao})
+    if alteracoes:
+        db.session.execute(update(Ativo), alteracoes)
+    return len(alteracoes)
+
+
+def registrar_recalculo_depreciacao(app):
+    """Registra o comando ``flask recalcular-depreciacao`` (agendar diariamente)"""
+
+    @app.cli.command('recalcular-depreciacao')
+    def recalcular_depreciacao_comando():
+        """Atualiza o valor_atual persistido dos ativos"""
+        total = recalcular_valores_atuais()
+        db.session.commit()
+        click.echo(f'{total} ativo(s) atualizado(s)')
+
+
+def _datas_projecao(anos):
+    """Hoje e o mesmo dia nos ``anos`` anos seguintes (29/02 vira 28/02)"""
+    hoje = date.today()
+    dia = 28 if (hoje.month, hoje.day) == (2, 29) else hoje.day
+    return [hoje] + [date(hoje.year + k, hoje.month, dia) for k in range(1, anos + 1)]
+
+
+def _mes_dia(data):
+    return data.month * 100 + data.day
+
+
+def projetar_depreciacao(anos, agrupar=None):
+    """Projeta o valor contábil dos ativos em atividade para os próximos anos.
+
+    Carrega apenas valor, data de aquisição, percentual e grupo como arrays
+    e calcula a matriz ativos x períodos com broadcasting do NumPy, com a
+    mesma regra de Ativo.calcular_depreciacao() (anos completos, valor
+    nunca abaixo de zero). Retorna os totais por período e, com
+    ``agrupar``, os totais de cada centro de custo ou tipo de ativo.
+    """
+    if agrupar is not None and agrupar not in AGRUPAMENTOS:
+        raise ParametroInvalido(f'Agrupamento inválido (use {" ou ".join(AGRUPAMENTOS)})')
+
+    colunas = [Ativo.valor_aquisicao, Ativo.data_aquisicao, Ativo.percentual_depreciacao]
+    if agrupar == 'centro_custo':
+        colunas += [Ativo.centro_custo_id, CentroCusto.nome]
+    elif agrupar == 'tipo_ativo':
+        colunas += [Ativo.tipo_ativo]
+    query = db.session.query(*colunas).filter(Ativo.status == 'ativo', Ativo.valor_aquisicao.isnot(None))
+    if agrupar == 'centro_custo':
+        query = query.outerjoin(CentroCusto, Ativo.centro_custo_id == CentroCusto.id)
+    linhas = query.all()
+
+    periodos = _datas_projecao(anos)
+    valores = np.fromiter((linha[0] for linha in linhas), dtype=np.float64, count=len(linhas))
+    taxas = np.fromiter((linha[2] or 0 for linha in linhas), dtype=np.float64, count=len(linhas)) / 100
+    ano_aquisicao = np.fromiter((linha[1].year for linha in linhas), dtype=np.int32, count=len(linhas))
+    mes_dia_aquisicao = np.fromiter((_mes_dia(linha[1]) for linha in linhas), dtype=np.int32, count=len(linhas))
+    ano_periodo = np.array([periodo.year for periodo in periodos], dtype=np.int32)
+    mes_dia_periodo = np.array([_mes_dia(periodo) for periodo in periodos], dtype=np.int32)
+
+    # Anos completos (ativos x períodos): diferença de anos menos 1 se o
+    # aniversário da aquisição ainda não chegou naquele período
+    decorridos = (ano_periodo[None, :] - ano_aquisicao[:, None]
+                  - (mes_dia_periodo[None, :] < mes_dia_aquisicao[:, None]))
+    decorridos = np.maximum(decorridos, 0)
+    projetado = np.maximum(valores[:, None] * (1 - taxas[:, None] * decorridos), 0)
+
+    resultado = {
+        'periodos': [periodo.isoformat() for periodo in periodos],
+        'total': np.round(projetado.sum(axis=0), 2).tolist(),
+        'quantidade_ativos': len(linhas)
+    }
+
+    if agrupar is not None:
+        nomes = {}
+        for linha in linhas:
+            # Tipo de ativo é chave e nome ao mesmo tempo
+            nomes.setdefault(linha[3], linha[4] if agrupar == 'centro_custo' else linha[3])
+        grupos = sorted(nomes, key=lambda chave: (chave is None, str(chave)))
+        indice = {chave: posicao for posicao, chave in enumerate(grupos)}
+        posicoes = np.fromiter((indice[linha[3]] for linha in linhas), dtype=np.intp, count=len(linhas))
+        totais = np.zeros((len(grupos), len(periodos)))
+        np.add.at(totais, posicoes, projetado)
+        quantidades = np.bincount(posicoes, minlength=len(grupos))
+        resultado['agrupamento'] = agrupar
+        resultado['grupos'] = [
+            {
+                'grupo': grupo,
+                'nome': nomes[grupo],
+                'quantidade_ativos': int(quantidades[posicao]),
+                'valores': np.round(totais[posicao], 2).tolist()
+            }
+            for posicao, grupo in enumerate(grupos)
+        ]
+
+    return resultado
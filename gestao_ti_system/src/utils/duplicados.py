@@ -0,0 +1,281 @@
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+import click
+import numpy as np
+from sqlalchemy.orm import load_only
+from src.models.user import db
+from src.models.chamado import Chamado
+from src.utils.busca_global import normalizar_texto
+from src.utils.replicas import somente_leitura
+from src.utils.versoes import versoes
+
+STATUS_ABERTOS = ('aberto', 'em_andamento', 'aguardando')
+JANELA_DIAS = 30
+LIMIAR_SIMILARIDADE = 0.35
+MAXIMO_SUGESTOES = 5
+
+PALAVRAS_IGNORADAS = frozenset('''
+    que nao com para por uma uns umas dos das nos nas mais mas como esta este estes estas
+    isso esse essa isto aqui ele ela eles elas sem ser tem foi sao pelo pela pelos pelas
+    seu sua seus suas meu minha quando onde muito tambem estou estao apos ainda
+    favor bom boa dia tarde noite ola obrigado obrigada preciso ajuda consigo
+'''.split())
+
+
+def tokenizar(texto):
+    """Termos normalizados (sem acento, minúsculos, 3+ caracteres)"""
+    return [
+        termo for termo in re.findall(r'[a-z0-9]+', normalizar_texto(texto or ''))
+        if len(termo) > 2 and termo not in PALAVRAS_IGNORADAS
+    ]
+
+
+class IndiceTfidf:
+    """Índice TF-IDF esparso em memória, atualizado documento a documento.
+
+    Cada documento guarda só os índices dos seus termos e o tf (1 + log da
+    contagem) em arrays NumPy; a frequência de documentos (df) é um array
+    denso pelo vocabulário. O idf é recalculado na consulta, de modo que
+    inserções e remoções não exigem reconstruir nada.
+    """
+
+    def __init__(self):
+        self._vocabulario = {}
+        self._df = np.zeros(1024, dtype=np.int32)
+        self._documentos = {}
+        self._postagens = {}
+
+    def __len__(self):
+        return len(self._documentos)
+
+    def __contains__(self, documento_id):
+        return documento_id in self._documentos
+
+    def ids(self):
+        return list(self._documentos)
+
+    def _indice_termo(self, termo):
+        indice = self._vocabulario.get(termo)
+        if indice is None:
+            indice = self._vocabulario[termo] = len(self._vocabulario)
+            if indice >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int32)])
+        return indice
+
+    def _vetorizar(self, texto, criar_termos):
+        contagens = Counter(tokenizar(texto))
+        if criar_termos:
+            itens = [(self._indice_termo(termo), qtd) for termo, qtd in contagens.items()]
+        else:
+            itens = [(self._vocabulario[termo], qtd) for termo, qtd in contagens.items() if termo in self._vocabulario]
+        termos = np.array([indice for indice, _ in itens], dtype=np.int32)
+        pesos = 1 + np.log(np.array([qtd for _, qtd in itens], dtype=np.float64))
+        return termos, pesos
+
+    def adicionar(self, documento_id, texto, data=None):
+        self.remover(documento_id)
+        termos, pesos = self._vetorizar(texto, criar_termos=True)
+        self._df[termos] += 1
+        for termo in termos.tolist():
+            self._postagens.setdefault(termo, set()).add(documento_id)
+        self._documentos[documento_id] = (termos, pesos, data)
+
+    def remover(self, documento_id):
+        documento = self._documentos.pop(documento_id, None)
+        if documento is None:
+            return
+        termos = documento[0]
+        self._df[termos] -= 1
+        for termo in termos.tolist():
+            self._postagens[termo].discard(documento_id)
+
+    def remover_anteriores(self, limite):
+        """Remove documentos com data anterior a ``limite``"""
+        antigos = [id_ for id_, (_, _, data) in self._documentos.items() if data is not None and data < limite]
+        for documento_id in antigos:
+            self.remover(documento_id)
+
+    def similares(self, texto, limite=MAXIMO_SUGESTOES, limiar=LIMIAR_SIMILARIDADE, excluir_id=None):
+        """[(documento_id, similaridade de cosseno)] em ordem decrescente.
+
+        Só os documentos que compartilham algum termo com o texto são
+        pontuados, todos de uma vez: os vetores dos candidatos são
+        concatenados e produtos e normas saem de np.bincount.
+        """
+        termos, pesos = self._vetorizar(texto, criar_termos=False)
+        if not len(termos):
+            return []
+
+        idf = np.log((1 + len(self._documentos)) / (1 + self._df[:len(self._vocabulario)])) + 1
+        consulta = np.zeros(len(idf))
+        consulta[termos] = pesos * idf[termos]
+        consulta /= np.linalg.norm(consulta)
+
+        candidatos = set().union(*(self._postagens.get(termo, ()) for termo in termos.tolist()))
+        candidatos.discard(excluir_id)
+        if not candidatos:
+            return []
+
+        candidatos = list(candidatos)
+        documentos = [self._documentos[id_] for id_ in candidatos]
+        posicoes = np.repeat(np.arange(len(documentos)), [len(doc[0]) for doc in documentos])
+        indices = np.concatenate([doc[0] for doc in documentos])
+        pesos_documentos = np.concatenate([doc[1] for doc in documentos]) * idf[indices]
+
+        normas = np.sqrt(np.bincount(posicoes, pesos_documentos ** 2, minlength=len(documentos)))
+        produtos = np.bincount(posicoes, pesos_documentos * consulta[indices], minlength=len(documentos))
+        pontuacoes = produtos / normas
+
+        melhores = np.argsort(-pontuacoes, kind='stable')[:limite]
+        return [(candidatos[i], float(pontuacoes[i])) for i in melhores if pontuacoes[i] >= limiar]
+
+
+def _texto_chamado(titulo, descricao):
+    # O título resume o problema; repeti-lo dá a ele mais peso que à descrição
+    return f'{titulo} {titulo} {descricao or ""}'
+
+
+class DetectorDuplicados:
+    """Índice do processo com os chamados abertos dos últimos ``janela_dias``.
+
+    Cada processo mantém o seu. Antes de consultar confere a versão da
+    tabela chamados (versoes_tabelas, incrementada a cada commit que a
+    altera); se mudou, compara os ids abertos da janela com os do índice,
+    incluindo os que faltam (criados por outros processos, em qualquer
+    ordem de commit, ou reabertos) e retirando os que fecharam. Os
+    candidatos retornados ainda são conferidos no banco.
+    """
+
+    LOTE_TEXTOS = 1000
+
+    def __init__(self, janela_dias=JANELA_DIAS):
+        self.janela_dias = janela_dias
+        self._lock = threading.Lock()
+        self._indice = IndiceTfidf()
+        self._versao = None
+
+    def _sincronizar(self):
+        inicio_janela = datetime.utcnow() - timedelta(days=self.janela_dias)
+        # Lida antes dos ids: um commit entre as duas leituras só provoca
+        # mais uma sincronização na próxima consulta
+        versao = versoes([Chamado.__tablename__])[0]
+        if versao and versao == self._versao:
+            self._indice.remover_anteriores(inicio_janela)
+            return
+
+        abertos = {
+            id_ for (id_,) in db.session.query(Chamado.id).filter(
+                Chamado.status.in_(STATUS_ABERTOS),
+                Chamado.data_abertura >= inicio_janela
+            )
+        }
+        for id_ in self._indice.ids():
+            if id_ not in abertos:
+                self._indice.remover(id_)
+        faltando = sorted(id_ for id_ in abertos if id_ not in self._indice)
+        for inicio in range(0, len(faltando), self.LOTE_TEXTOS):
+            for id_, titulo, descricao, data_abertura in db.session.query(
+                Chamado.id, Chamado.titulo, Chamado.descricao, Chamado.data_abertura
+            ).filter(Chamado.id.in_(faltando[inicio:inicio + self.LOTE_TEXTOS])):
+                self._indice.adicionar(id_, _texto_chamado(titulo, descricao), data_abertura)
+        self._versao = versao
+
+    def registrar(self, chamado):
+        """Inclui no índice um chamado recém-criado"""
+        with self._lock:
+            self._indice.adicionar(chamado.id, _texto_chamado(chamado.titulo, chamado.descricao), chamado.data_abertura)
+
+    def descartar(self, chamado_id):
+        """Retira do índice um chamado que deixou de estar aberto"""
+        with self._lock:
+            self._indice.remover(chamado_id)
+
+    @somente_leitura
+    def possiveis_duplicados(self, titulo, descricao, excluir_id=None, limite=MAXIMO_SUGESTOES):
+        """Chamados abertos parecidos com o título/descrição informados"""
+        with self._lock:
+            self._sincronizar()
+            similares = self._indice.similares(_texto_chamado(titulo, descricao), limite=limite, excluir_id=excluir_id)
+        if not similares:
+            return []
+
+        chamados = {
+            chamado.id: chamado
+            for chamado in Chamado.query.options(load_only(
+                Chamado.numero_chamado, Chamado.titulo, Chamado.status, Chamado.data_abertura
+            )).filter(Chamado.id.in_([id_ for id_, _ in similares])).all()
+        }
+        resultados = []
+        for id_, pontuacao in similares:
+            chamado = chamados.get(id_)
+            if chamado is None or chamado.status not in STATUS_ABERTOS:
+                self.descartar(id_)
+                continue
+            resultados.append({
+                'id': chamado.id,
+                'numero_chamado': chamado.numero_chamado,
+                'titulo': chamado.titulo,
+                'status': chamado.status,
+                'data_abertura': chamado.data_abertura,
+                'pontuacao': round(pontuacao, 4)
+            })
+        return resultados
+
+
+detector_duplicados = DetectorDuplicados()
+
+
+@somente_leitura
+def agrupar_backlog(limiar=LIMIAR_SIMILARIDADE):
+    """Agrupa todos os chamados abertos por similaridade (modo em lote).
+
+    Monta um índice com o backlog inteiro, liga cada chamado aos vizinhos
+    acima do limiar e devolve os componentes conexos com mais de um
+    chamado, maiores primeiro, como listas de (id, numero_chamado, titulo).
+    """
+    indice = IndiceTfidf()
+    chamados = {}
+    for id_, numero, titulo, descricao in db.session.query(
+        Chamado.id, Chamado.numero_chamado, Chamado.titulo, Chamado.descricao
+    ).filter(Chamado.status.in_(STATUS_ABERTOS)).yield_per(1000):
+        texto = _texto_chamado(titulo, descricao)
+        indice.adicionar(id_, texto)
+        chamados[id_] = (numero, titulo, texto)
+
+    pais = {id_: id_ for id_ in chamados}
+
+    def raiz(id_):
+        while pais[id_] != id_:
+            pais[id_] = pais[pais[id_]]
+            id_ = pais[id_]
+        return id_
+
+    for id_, (_, _, texto) in chamados.items():
+        for vizinho, _ in indice.similares(texto, limite=50, limiar=limiar, excluir_id=id_):
+            pais[raiz(vizinho)] = raiz(id_)
+
+    grupos = {}
+    for id_ in chamados:
+        grupos.setdefault(raiz(id_), []).append(id_)
+    return sorted(
+        ([(id_, chamados[id_][0], chamados[id_][1]) for id_ in sorted(membros)]
+         for membros in grupos.values() if len(membros) > 1),
+        key=len, reverse=True
+    )
+
+
+def registrar_agrupamento_duplicados(app):
+    """Registra o comando ``flask agrupar-chamados-duplicados``"""
+
+    @app.cli.command('agrupar-chamados-duplicados')
+    @click.option('--limiar', default=LIMIAR_SIMILARIDADE, show_default=True, help='Similaridade mínima (0 a 1)')
+    def agrupar_chamados_duplicados_comando(limiar):
+        """Lista grupos de chamados abertos que parecem tratar do mesmo problema"""
+        grupos = agrupar_backlog(limiar)
+        for numero_grupo, membros in enumerate(grupos, start=1):
+            click.echo(f'Grupo {numero_grupo} ({len(membros)} chamados)')
+            for _, numero_chamado, titulo in membros:
+                click.echo(f'  {numero_chamado}  {titulo}')
+        click.echo(f'{len(grupos)} grupo(s) encontrado(s)')
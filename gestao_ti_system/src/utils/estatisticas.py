@@ -0,0 +1,139 @@
+import threading
+import time
+from datetime import date, timedelta
+from sqlalchemy import and_, func
+from src.models.user import db
+from src.models.compra import Compra
+from src.models.ativo import Ativo
+from src.models.chamado import Chamado
+from src.models.inventario import Inventario
+from src.models.conta_mensal import ContaMensal
+
+# Dashboard.jsx pede estatísticas e alertas em paralelo; um cache curto
+# faz com que as duas chamadas compartilhem o mesmo cálculo
+VALIDADE_CACHE_SEGUNDOS = 5
+
+_cache_lock = threading.Lock()
+_cache = {'indicadores': None, 'calculado_em': 0.0}
+
+
+def _contar(condicao=None):
+    """COUNT(*) simples ou condicional (COUNT(*) FILTER (WHERE ...))"""
+    if condicao is None:
+        return func.count()
+    return func.count().filter(condicao)
+
+
+def _agregar(modelo, **contagens):
+    """Executa uma única varredura agregada na tabela do modelo"""
+    colunas = [expressao.label(nome) for nome, expressao in contagens.items()]
+    linha = db.session.query(*colunas).select_from(modelo).one()
+    return {nome: int(getattr(linha, nome) or 0) for nome in contagens}
+
+
+def calcular_indicadores():
+    """Calcula todos os indicadores do dashboard com uma consulta por tabela"""
+    hoje = date.today()
+    limite_licencas = hoje + timedelta(days=30)
+    limite_contas = hoje + timedelta(days=7)
+
+    compras = _agregar(
+        Compra,
+        total=_contar(),
+        pendentes=_contar(Compra.status == 'solicitado'),
+        em_andamento=_contar(Compra.status == 'em_andamento')
+    )
+
+    chamados = _agregar(
+        Chamado,
+        total=_contar(),
+        abertos=_contar(Chamado.status == 'aberto'),
+        em_andamento=_contar(Chamado.status == 'em_andamento'),
+        criticos=_contar(and_(Chamado.prioridade == 'critica', Chamado.status == 'aberto'))
+    )
+
+    ativos = _agregar(
+        Ativo,
+        total=_contar(Ativo.status == 'ativo'),
+        licencas_vencendo=_contar(and_(
+            Ativo.data_vencimento_licenca.isnot(None),
+            Ativo.data_vencimento_licenca <= limite_licencas,
+            Ativo.status == 'ativo'
+        ))
+    )
+
+    inventario = _agregar(
+        Inventario,
+        total_itens=_contar(),
+        estoque_baixo=_contar(Inventario.estoque_baixo)
+    )
+
+    contas_mensais = _agregar(
+        ContaMensal,
+        vencidas=_contar(and_(
+            ContaMensal.data_vencimento < hoje,
+            ContaMensal.status_pagamento == 'pendente'
+        )),
+        vencendo=_contar(and_(
+            ContaMensal.data_vencimento <= limite_contas,
+            ContaMensal.data_vencimento >= hoje,
+            ContaMensal.status_pagamento == 'pendente'
+        ))
+    )
+
+    return {
+        'compras': compras,
+        'chamados': chamados,
+        'ativos': ativos,
+        'inventario': inventario,
+        'contas_mensais': contas_mensais
+    }
+
+
+def obter_indicadores():
+    """Retorna os indicadores, reaproveitando o cálculo recente do processo"""
+    with _cache_lock:
+        agora = time.monotonic()
+        if _cache['indicadores'] is None or agora - _cache['calculado_em'] > VALIDADE_CACHE_SEGUNDOS:
+            _cache['indicadores'] = calcular_indicadores()
+            _cache['calculado_em'] = agora
+        return _cache['indicadores']
+
+
+def montar_alertas(indicadores):
+    """Deriva a lista de alertas a partir dos indicadores já calculados"""
+    alertas = []
+
+    chamados_criticos = indicadores['chamados']['criticos']
+    if chamados_criticos > 0:
+        alertas.append({
+            'tipo': 'critico',
+            'mensagem': f'{chamados_criticos} chamado(s) crítico(s) em aberto',
+            'modulo': 'chamados'
+        })
+
+    licencas_vencendo = indicadores['ativos']['licencas_vencendo']
+    if licencas_vencendo > 0:
+        alertas.append({
+            'tipo': 'aviso',
+            'mensagem': f'{licencas_vencendo} licença(s) vencendo nos próximos 30 dias',
+            'modulo': 'ativos'
+        })
+
+    itens_estoque_baixo = indicadores['inventario']['estoque_baixo']
+    if itens_estoque_baixo > 0:
+        alertas.append({
+            'tipo': 'aviso',
+            'mensagem': f'{itens_estoque_baixo} item(ns) com estoque abaixo do mínimo',
+            'modulo': 'inventario'
+        })
+
+    contas_vencidas = indicadores['contas_mensais']['vencidas']
+    if contas_vencidas > 0:
+        alertas.append({
+            'tipo': 'critico',
+            'mensagem': f'{contas_vencidas} conta(s) vencida(s)',
+            'modulo': 'contas_mensais'
+        })
+
+    return alertas
@@ -0,0 +1,245 @@
+from sqlalchemy import case, insert, update
+from src.models.user import db
+from src.models.inventario import Inventario, MovimentacaoInventario
+
+TIPOS_MOVIMENTACAO = ('entrada', 'saida', 'ajuste', 'transferencia')
+LIMITE_LINHAS_LOTE = 1000
+
+
+class MovimentacaoInvalida(ValueError):
+    """Dados da movimentação inválidos (HTTP 400)"""
+
+
+class EstoqueInsuficiente(MovimentacaoInvalida):
+    """Saída maior que a quantidade disponível (HTTP 400)"""
+
+    def __init__(self, mensagem='Quantidade insuficiente em estoque'):
+        super().__init__(mensagem)
+
+
+class ItemNaoEncontrado(LookupError):
+    """Item de inventário inexistente (HTTP 404)"""
+
+    def __init__(self, item_id):
+        super().__init__(f'Item de inventário {item_id} não encontrado')
+        self.item_id = item_id
+
+
+def validar_movimentacao(tipo, quantidade, item_id=None, item_destino_id=None):
+    """Valida tipo e quantidade de uma movimentação"""
+    if tipo not in TIPOS_MOVIMENTACAO:
+        raise MovimentacaoInvalida('Tipo de movimentação inválido')
+    if isinstance(quantidade, bool) or not isinstance(quantidade, int):
+        raise MovimentacaoInvalida('Quantidade deve ser um número inteiro')
+    if tipo == 'ajuste':
+        if quantidade < 0:
+            raise MovimentacaoInvalida('Quantidade do ajuste não pode ser negativa')
+    elif quantidade <= 0:
+        raise MovimentacaoInvalida('Quantidade deve ser maior que zero')
+    if tipo == 'transferencia':
+        if not item_destino_id:
+            raise MovimentacaoInvalida('Item de destino é obrigatório para transferência')
+        if isinstance(item_destino_id, bool) or not isinstance(item_destino_id, int):
+            raise MovimentacaoInvalida('Item de destino deve ser um id inteiro')
+        if item_destino_id == item_id:
+            raise MovimentacaoInvalida('Item de destino deve ser diferente do item de origem')
+
+
+def _somar_quantidade(item_id, delta):
+    """UPDATE condicional e atômico; retorna a nova quantidade ou None.
+
+    Para saídas a condição ``quantidade >= :q`` garante que o estoque nunca
+    fique negativo, mesmo com requisições concorrentes, sem ler a linha antes.
+    """
+    stmt = update(Inventario).where(Inventario.id == item_id)
+    if delta < 0:
+        stmt = stmt.where(Inventario.quantidade >= -delta)
+    stmt = stmt.values(quantidade=Inventario.quantidade + delta).returning(Inventario.quantidade)
+    return db.session.execute(stmt, execution_options={'synchronize_session': False}).scalar()
+
+
+def _falha_atualizacao(item_id):
+    """Diferencia item inexistente de estoque insuficiente"""
+    if db.session.query(Inventario.id).filter_by(id=item_id).first() is None:
+        return ItemNaoEncontrado(item_id)
+    return EstoqueInsuficiente()
+
+
+def _aplicar_delta(item_id, delta):
+    nova_quantidade = _somar_quantidade(item_id, delta)
+    if nova_quantidade is None:
+        raise _falha_atualizacao(item_id)
+    return nova_quantidade - delta, nova_quantidade
+
+
+def _aplicar_ajuste(item_id, quantidade):
+    # O ajuste define um valor absoluto e precisa do valor anterior para o
+    # histórico; é a única operação que bloqueia a linha (SELECT FOR UPDATE)
+    quantidade_anterior = db.session.query(Inventario.quantidade).filter_by(id=item_id).with_for_update().scalar()
+    if quantidade_anterior is None:
+        raise ItemNaoEncontrado(item_id)
+    db.session.execute(
+        update(Inventario).where(Inventario.id == item_id).values(quantidade=quantidade),
+        execution_options={'synchronize_session': False}
+    )
+    return quantidade_anterior, quantidade
+
+
+def movimentar_estoque(item_id, tipo, quantidade, usuario_id, motivo=None, item_destino_id=None):
+    """Aplica uma movimentação de estoque na transação corrente.
+
+    Entradas, saídas e transferências são UPDATEs condicionais com
+    RETURNING, sem leitura prévia nem bloqueio explícito. Retorna as
+    movimentações registradas (duas na transferência: origem e destino);
+    o commit fica a cargo de quem chama.
+    """
+    validar_movimentacao(tipo, quantidade, item_id, item_destino_id)
+
+    if tipo == 'ajuste':
+        alteracoes = [(item_id, _aplicar_ajuste(item_id, quantidade))]
+    elif tipo == 'transferencia':
+        # Atualiza sempre na ordem dos ids para evitar deadlock entre
+        # transferências simultâneas em sentidos opostos
+        deltas = {item_id: -quantidade, item_destino_id: quantidade}
+        resultados = {id_: _aplicar_delta(id_, deltas[id_]) for id_ in sorted(deltas)}
+        alteracoes = [(item_id, resultados[item_id]), (item_destino_id, resultados[item_destino_id])]
+    else:
+        delta = quantidade if tipo == 'entrada' else -quantidade
+        alteracoes = [(item_id, _aplicar_delta(item_id, delta))]
+
+    movimentacoes = []
+    for id_, (quantidade_anterior, nova_quantidade) in alteracoes:
+        movimentacao = MovimentacaoInventario(
+            inventario_id=id_,
+            usuario_id=usuario_id,
+            tipo_movimentacao=tipo,
+            quantidade=quantidade,
+            quantidade_anterior=quantidade_anterior,
+            quantidade_nova=nova_quantidade,
+            motivo=motivo
+        )
+        db.session.add(movimentacao)
+        movimentacoes.append(movimentacao)
+    return movimentacoes
+
+
+def _aplicar_linha(quantidades, linha):
+    """Aplica uma linha do lote sobre as quantidades em memória.
+
+    Retorna as alterações [(item_id, anterior, nova)] sem modificar
+    ``quantidades`` se a linha for inválida.
+    """
+    item_id = linha['item_id']
+    tipo = linha['tipo_movimentacao']
+    quantidade = linha['quantidade']
+    item_destino_id = linha.get('item_destino_id')
+    validar_movimentacao(tipo, quantidade, item_id, item_destino_id)
+
+    for id_ in (item_id, item_destino_id) if tipo == 'transferencia' else (item_id,):
+        if id_ not in quantidades:
+            raise ItemNaoEncontrado(id_)
+
+    atual = quantidades[item_id]
+    if tipo == 'entrada':
+        alteracoes = [(item_id, atual, atual + quantidade)]
+    elif tipo == 'ajuste':
+        alteracoes = [(item_id, atual, quantidade)]
+    else:
+        if atual < quantidade:
+            raise EstoqueInsuficiente()
+        alteracoes = [(item_id, atual, atual - quantidade)]
+        if tipo == 'transferencia':
+            destino = quantidades[item_destino_id]
+            alteracoes.append((item_destino_id, destino, destino + quantidade))
+
+    for id_, _, nova in alteracoes:
+        quantidades[id_] = nova
+    return alteracoes
+
+
+def movimentar_estoque_lote(linhas, usuario_id, tudo_ou_nada=True):
+    """Aplica várias movimentações com poucas instruções SQL.
+
+    Os itens envolvidos são lidos e bloqueados de uma vez (em ordem de id),
+    as linhas são aplicadas em sequência na memória, as quantidades finais
+    são gravadas com um único UPDATE (CASE por id) e as movimentações com um
+    INSERT em lote. Com ``tudo_ou_nada`` qualquer linha inválida rejeita o
+    lote inteiro; caso contrário as linhas válidas são aplicadas.
+
+    Retorna (resultados por linha, houve_falha). O commit fica a cargo de
+    quem chama.
+    """
+    if not linhas:
+        raise MovimentacaoInvalida('Nenhuma movimentação informada')
+    if len(linhas) > LIMITE_LINHAS_LOTE:
+        raise MovimentacaoInvalida(f'Lote excede o limite de {LIMITE_LINHAS_LOTE} linhas')
+
+    ids = {
+        linha[chave]
+        for linha in linhas if isinstance(linha, dict)
+        for chave in ('item_id', 'item_destino_id') if isinstance(linha.get(chave), int)
+    }
+
+    quantidades = dict(
+        db.session.query(Inventario.id, Inventario.quantidade)
+        .filter(Inventario.id.in_(ids))
+        .order_by(Inventario.id)
+        .with_for_update()
+        .all()
+    )
+    iniciais = dict(quantidades)
+
+    resultados = []
+    registros = []
+    for numero, linha in enumerate(linhas, start=1):
+        try:
+            if not isinstance(linha, dict) or 'item_id' not in linha or 'tipo_movimentacao' not in linha or 'quantidade' not in linha:
+                raise MovimentacaoInvalida('Linha deve conter item_id, tipo_movimentacao e quantidade')
+            alteracoes = _aplicar_linha(quantidades, linha)
+        except (MovimentacaoInvalida, ItemNaoEncontrado) as e:
+            resultados.append({'linha': numero, 'sucesso': False, 'erro': str(e)})
+            continue
+
+        for id_, anterior, nova in alteracoes:
+            registros.append({
+                'inventario_id': id_,
+                'usuario_id': linha.get('usuario_id', usuario_id),
+                'tipo_movimentacao': linha['tipo_movimentacao'],
+                'quantidade': linha['quantidade'],
+                'quantidade_anterior': anterior,
+                'quantidade_nova': nova,
+                'motivo': linha.get('motivo')
+            })
+        resultados.append({
+            'linha': numero,
+            'sucesso': True,
+            'item_id': linha['item_id'],
+            'quantidade_anterior': alteracoes[0][1],
+            'quantidade_nova': alteracoes[0][2]
+        })
+
+    houve_falha = any(not resultado['sucesso'] for resultado in resultados)
+    if houve_falha and tudo_ou_nada:
+        return resultados, True
+
+    finais = {id_: qtd for id_, qtd in quantidades.items() if qtd != iniciais[id_]}
+    if finais:
+        db.session.execute(
+            update(Inventario)
+            .where(Inventario.id.in_(finais))
+            .values(quantidade=case(finais, value=Inventario.id)),
+            execution_options={'synchronize_session': False}
+        )
+    if registros:
+        ids_movimentacoes = db.session.scalars(
+            insert(MovimentacaoInventario).returning(MovimentacaoInventario.id, sort_by_parameter_order=True),
+            registros
+        ).all()
+        # Cada resultado de sucesso aponta para a movimentação do item de origem
+        posicao = 0
+        for resultado in resultados:
+            if resultado['sucesso']:
+                resultado['movimentacao_id'] = ids_movimentacoes[posicao]
+                posicao += 2 if linhas[resultado['linha'] - 1]['tipo_movimentacao'] == 'transferencia' else 1
+
+    return resultados, houve_falha
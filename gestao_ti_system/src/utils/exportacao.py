@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import date, datetime
+from flask import Response, current_app, request, stream_with_context
+from src.utils.campos import ler_projecao
+from src.utils.paginacao import ParametroInvalido
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+# Registros buscados por ida ao banco (cursor do lado do servidor) e
+# enviados por bloco ao cliente
+TAMANHO_LOTE = 1000
+
+
+def formato_exportacao():
+    """Formato de exportação pedido via ?format= (None para JSON normal)"""
+    formato = request.args.get('format')
+    if not formato or formato == 'json':
+        return None
+    if formato not in FORMATOS:
+        raise ParametroInvalido('Formato inválido (use json, ndjson ou csv)')
+    return formato
+
+
+def _gerar_ndjson(query, serializar):
+    json = current_app.json
+    bloco = []
+    for registro in query.yield_per(TAMANHO_LOTE):
+        bloco.append(json.dumps(serializar(registro)))
+        if len(bloco) >= TAMANHO_LOTE:
+            yield '\n'.join(bloco) + '\n'
+            bloco = []
+    if bloco:
+        yield '\n'.join(bloco) + '\n'
+
+
+def _valor_csv(valor):
+    # Datas no mesmo formato ISO 8601 das respostas JSON
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def _gerar_csv(query, serializar, projecao):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    relacoes = {relacao: campos for relacao, campos in projecao.campos_expandidos()}
+
+    escritor.writerow(projecao.cabecalho_csv())
+    linhas = 0
+    for registro in query.yield_per(TAMANHO_LOTE):
+        dados = serializar(registro)
+        linha = [dados[campo] for campo in projecao.campos]
+        for relacao, campos in relacoes.items():
+            aninhado = dados[relacao] or {}
+            linha.extend(aninhado.get(campo) for campo in campos)
+        escritor.writerow([_valor_csv(valor) for valor in linha])
+        linhas += 1
+        if linhas % TAMANHO_LOTE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def exportar(query, serializar, nome_recurso, nome_arquivo):
+    """Resposta em streaming (NDJSON ou CSV) para uma listagem.
+
+    Os registros são lidos com yield_per, que no PostgreSQL usa cursor do
+    lado do servidor, e enviados ao cliente à medida que chegam; a memória
+    usada não depende do tamanho do resultado.
+    """
+    formato = formato_exportacao()
+    if formato == 'csv':
+        gerador = _gerar_csv(query, serializar, ler_projecao(nome_recurso))
+    else:
+        gerador = _gerar_ndjson(query, serializar)
+
+    resposta = Response(stream_with_context(gerador), content_type=FORMATOS[formato])
+    resposta.headers['Content-Disposition'] = f'attachment; filename={nome_arquivo}.{formato}'
+    return resposta
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa o json da biblioteca padrão
+    orjson = None
+
+
+def converter_valor(valor):
+    """Converte os tipos que os to_dict() entregam sem tratamento
+
+    Os demais tipos (UUID, dataclasses, Markup...) seguem o tratamento
+    padrão do Flask.
+    """
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Row):
+        return valor._asdict()
+    return DefaultJSONProvider.default(valor)
+
+
+class ProvedorJson(DefaultJSONProvider):
+    """Provedor JSON da aplicação.
+
+    Serializa Decimal, date/datetime (ISO 8601) e linhas do SQLAlchemy
+    diretamente, de modo que os to_dict() podem devolver os valores
+    crus das colunas. Com orjson instalado a serialização é feita por ele
+    (datas são tratadas nativamente) e a resposta já sai em bytes.
+    """
+
+    default = staticmethod(converter_valor)
+
+    def _opcoes_orjson(self, indentar=False):
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=converter_valor, option=self._opcoes_orjson()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indentar = self.compact is False or (self.compact is None and self._app.debug)
+        corpo = orjson.dumps(obj, default=converter_valor, option=self._opcoes_orjson(indentar))
+        return self._app.response_class(corpo, mimetype=self.mimetype)
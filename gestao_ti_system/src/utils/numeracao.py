@@ -0,0 +1,37 @@
+from sqlalchemy import text
+from src.models.user import db
+
+_INCREMENTAR = text(
+    'UPDATE contadores_numeracao SET ultimo_numero = ultimo_numero + 1 '
+    'WHERE serie = :serie AND ano = :ano '
+    'RETURNING ultimo_numero'
+)
+
+_CRIAR = text(
+    'INSERT INTO contadores_numeracao (serie, ano, ultimo_numero) '
+    'VALUES (:serie, :ano, :numero) '
+    'ON CONFLICT (serie, ano) DO UPDATE '
+    'SET ultimo_numero = contadores_numeracao.ultimo_numero + 1 '
+    'RETURNING ultimo_numero'
+)
+
+
+def alocar_numero(serie, ano, semente):
+    """Reserva o próximo número sequencial da série no ano.
+
+    O incremento é um único UPDATE ... RETURNING na linha do contador, que
+    fica bloqueada até o fim da transação: requisições concorrentes (mesmo
+    em workers diferentes) recebem números distintos e, se a transação for
+    desfeita, o número volta a ficar disponível.
+
+    ``semente`` é chamada apenas na criação do contador do ano e deve
+    retornar o maior número já usado, para continuar a numeração existente.
+    """
+    parametros = {'serie': serie, 'ano': ano}
+    numero = db.session.execute(_INCREMENTAR, parametros).scalar()
+    if numero is None:
+        # Primeiro número do ano: se outra requisição criar o contador ao
+        # mesmo tempo, o ON CONFLICT transforma esta inserção em incremento
+        parametros['numero'] = semente() + 1
+        numero = db.session.execute(_CRIAR, parametros).scalar()
+    return numero
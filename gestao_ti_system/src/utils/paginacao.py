@@ -0,0 +1,160 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import text, tuple_
+from src.models.user import db
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro de consulta inválido (resulta em HTTP 400)"""
+
+
+def paginacao_solicitada():
+    """Indica se a requisição pediu o modo paginado (limit/cursor)"""
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def ler_limite():
+    """Lê e valida o parâmetro limit da requisição"""
+    valor = request.args.get('limit')
+    if not valor:
+        return LIMITE_PADRAO
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise ParametroInvalido('Parâmetro limit inválido')
+    if limite < 1:
+        raise ParametroInvalido('Parâmetro limit deve ser maior que zero')
+    return min(limite, LIMITE_MAXIMO)
+
+
+def _serializar_valor(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def _converter_valor(coluna, valor):
+    """Converte o valor salvo no cursor para o tipo Python da coluna"""
+    if valor is None:
+        return None
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valor, id_):
+    """Gera o cursor opaco a partir da chave de ordenação do último item"""
+    bruto = json.dumps([_serializar_valor(valor), id_], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, coluna_ordem):
+    """Recupera a chave (valor, id) de um cursor opaco"""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valor, id_ = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        return _converter_valor(coluna_ordem, valor), int(id_)
+    except (ValueError, TypeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+def _condicao_apos(coluna_ordem, coluna_id, valor, id_, descendente):
+    """Condição de seek para os registros posteriores à chave (valor, id).
+
+    Comparação de row values: o PostgreSQL usa (valor, id) como início de
+    um intervalo do índice keyset, com custo constante em qualquer página.
+    Só cobre linhas com valor de ordenação; a cauda NULL é lida à parte
+    (ver paginar_keyset).
+    """
+    chave, cursor = tuple_(coluna_ordem, coluna_id), tuple_(valor, id_)
+    return chave < cursor if descendente else chave > cursor
+
+
+def ordenacao_keyset(coluna_ordem, coluna_id, descendente=True):
+    """Cláusulas ORDER BY compatíveis com o seek do cursor"""
+    if descendente:
+        return coluna_ordem.desc().nullslast(), coluna_id.desc()
+    return coluna_ordem.asc().nullslast(), coluna_id.asc()
+
+
+def estimar_total(query, tabela, filtrada):
+    """Estimativa barata do total de registros.
+
+    Sem filtros usa pg_class.reltuples; com filtros usa a estimativa de
+    linhas do planejador (EXPLAIN), sem executar a consulta. Em bancos que
+    não são PostgreSQL (ou tabelas nunca analisadas) faz a contagem exata.
+    """
+    query = query.enable_eagerloads(False).order_by(None)
+    if db.engine.dialect.name == 'postgresql':
+        if not filtrada:
+            estimativa = db.session.execute(
+                text('SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:tabela AS regclass)'),
+                {'tabela': tabela}
+            ).scalar()
+            if estimativa is not None and estimativa >= 0:
+                return int(estimativa)
+        else:
+            try:
+                sql = query.statement.compile(
+                    dialect=db.engine.dialect,
+                    compile_kwargs={'literal_binds': True}
+                )
+                plano = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+                return int(plano[0]['Plan']['Plan Rows'])
+            except Exception:
+                pass
+    return query.count()
+
+
+def paginar_keyset(query, coluna_ordem, coluna_id, serializar, descendente=True, filtrada=False):
+    """Executa a consulta em modo keyset e monta a resposta paginada.
+
+    Retorna um dict com ``itens``, ``next_cursor`` (None na última página)
+    e ``total_estimado``.
+    """
+    limite = ler_limite()
+    cursor = request.args.get('cursor')
+    total_estimado = estimar_total(query, coluna_id.table.name, filtrada)
+
+    aceita_nulo = coluna_ordem.expression.nullable
+    ordem_id = coluna_id.desc() if descendente else coluna_id.asc()
+    valor, id_ = decodificar_cursor(cursor, coluna_ordem) if cursor else (None, None)
+
+    registros = []
+    if not cursor or valor is not None:
+        # Linhas com valor de ordenação (NULLS LAST: vêm antes da cauda NULL)
+        consulta = query.filter(coluna_ordem.isnot(None)) if aceita_nulo else query
+        if cursor:
+            consulta = consulta.filter(_condicao_apos(coluna_ordem, coluna_id, valor, id_, descendente))
+        registros = consulta.order_by(*ordenacao_keyset(coluna_ordem, coluna_id, descendente)).limit(limite + 1).all()
+
+    if aceita_nulo and len(registros) <= limite:
+        # Cauda sem valor de ordenação, percorrida só pelo id; o cursor
+        # chega aqui com valor None
+        consulta = query.filter(coluna_ordem.is_(None))
+        if cursor and valor is None:
+            consulta = consulta.filter(coluna_id < id_ if descendente else coluna_id > id_)
+        registros += consulta.order_by(ordem_id).limit(limite + 1 - len(registros)).all()
+
+    proximo_cursor = None
+    if len(registros) > limite:
+        registros = registros[:limite]
+        ultimo = registros[-1]
+        proximo_cursor = codificar_cursor(
+            getattr(ultimo, coluna_ordem.key),
+            getattr(ultimo, coluna_id.key)
+        )
+
+    return {
+        'itens': [serializar(registro) for registro in registros],
+        'next_cursor': proximo_cursor,
+        'total_estimado': total_estimado
+    }
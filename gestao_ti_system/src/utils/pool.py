@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMonitorado(QueuePool):
+    """QueuePool que registra quanto tempo as requisições esperam por uma
+    conexão livre (e quantas desistiram após pool_timeout)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_estatisticas = threading.Lock()
+        self._obtencoes = 0
+        self._esperas = 0
+        self._tempo_espera = 0.0
+        self._maior_espera = 0.0
+        self._esgotamentos = 0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutPool:
+            with self._lock_estatisticas:
+                self._esgotamentos += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._lock_estatisticas:
+                self._obtencoes += 1
+                self._tempo_espera += espera
+                self._maior_espera = max(self._maior_espera, espera)
+                # Abaixo de 1 ms é só o custo de pegar uma conexão livre
+                if espera >= 0.001:
+                    self._esperas += 1
+
+    def estatisticas_espera(self):
+        with self._lock_estatisticas:
+            return {
+                'obtencoes': self._obtencoes,
+                'esperas': self._esperas,
+                'esgotamentos': self._esgotamentos,
+                'espera_media_ms': round(self._tempo_espera * 1000 / self._obtencoes, 3) if self._obtencoes else 0.0,
+                'maior_espera_ms': round(self._maior_espera * 1000, 3)
+            }
+
+
+def estatisticas_pool(engine):
+    """Situação do pool de conexões deste processo (cada worker tem o seu)"""
+    pool = engine.pool
+    resultado = {'pid': os.getpid(), 'classe': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        resultado.update({
+            'tamanho': pool.size(),
+            'disponiveis': pool.checkedin(),
+            'em_uso': pool.checkedout(),
+            # overflow() começa em -pool_size; positivo = conexões além do pool
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout_s': pool.timeout()
+        })
+    if isinstance(pool, PoolMonitorado):
+        resultado.update(pool.estatisticas_espera())
+    return resultado
@@ -0,0 +1,212 @@
+import os
+import random
+import threading
+import time
+import weakref
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+PREFIXO_REPLICA = 'replica_'
+CHAVE_REPLICA = 'replica'
+COOKIE_LEITURA_PRIMARIO = 'leitura_primario'
+
+# Atraso de replicação em segundos (0 quando a réplica está em dia ou o
+# servidor não é uma réplica)
+SQL_ATRASO_REPLICA = text('''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+''')
+
+_engines_replica = weakref.WeakSet()
+
+
+def eh_replica(engine):
+    return engine in _engines_replica
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia as leituras para a réplica escolhida.
+
+    Quando ``info['replica']`` indica uma bind de réplica, as consultas dos
+    modelos da bind padrão vão para ela; o flush (escritas) continua
+    sempre no primário.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        chave = self.info.get(CHAVE_REPLICA)
+        if chave is None or bind is not None or self._flushing:
+            return engine
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine
+        return engines[chave]
+
+
+def _chaves_replica(config):
+    return [chave for chave in config.get('SQLALCHEMY_BINDS', {}) if chave.startswith(PREFIXO_REPLICA)]
+
+
+class MonitorReplicas:
+    """Escolhe uma réplica com atraso aceitável.
+
+    O atraso de cada réplica é medido por uma thread de cada processo a
+    cada DB_REPLICA_INTERVALO_VERIFICACAO segundos; as requisições só leem
+    o último resultado, então uma réplica lenta ou fora do ar nunca
+    segura as leituras. Réplicas inacessíveis, atrasadas ou sem medição
+    recente ficam de fora; sem nenhuma disponível as leituras vão para o
+    primário.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._situacao = {}
+        self._thread = None
+        self._pid = None
+
+    def _medir_atraso(self, engine):
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        with engine.connect() as conexao:
+            return float(conexao.execute(SQL_ATRASO_REPLICA).scalar())
+
+    def verificar(self, app):
+        """Mede o atraso de todas as réplicas (fora do lock: as medições
+        podem demorar até o connect_timeout)"""
+        engines = app.extensions['sqlalchemy'].engines
+        for chave in _chaves_replica(app.config):
+            try:
+                atraso = self._medir_atraso(engines[chave])
+            except Exception:
+                atraso = None
+            with self._lock:
+                self._situacao[chave] = (time.monotonic(), atraso)
+
+    def _executar(self, app):
+        intervalo = app.config.get('DB_REPLICA_INTERVALO_VERIFICACAO', 5)
+        while True:
+            with app.app_context():
+                try:
+                    self.verificar(app)
+                except Exception as e:
+                    print(f"Erro ao verificar réplicas: {e}")
+            time.sleep(intervalo)
+
+    def iniciar(self, app):
+        """Inicia a thread de verificação deste processo, se ainda não
+        estiver rodando (após o fork de cada worker a do pai não existe)"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock_thread:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._executar, args=(app,), name='monitor-replicas', daemon=True
+            )
+            self._thread.start()
+
+    def escolher(self):
+        """Chave da bind de uma réplica utilizável, ou None (primário)"""
+        config = current_app.config
+        chaves = _chaves_replica(config)
+        if not chaves:
+            return None
+        app = current_app._get_current_object()
+        if not has_request_context() and not self._situacao:
+            # Comandos CLI: a primeira medição pode ser feita na hora
+            self.verificar(app)
+        self.iniciar(app)
+        atraso_maximo = config.get('DB_REPLICA_ATRASO_MAXIMO', 5)
+        # Medição parada (ex.: thread presa numa réplica fora do ar) não vale
+        validade = 3 * config.get('DB_REPLICA_INTERVALO_VERIFICACAO', 5) + config.get('DB_CONNECT_TIMEOUT', 5)
+        agora = time.monotonic()
+        with self._lock:
+            situacao = {chave: self._situacao.get(chave) for chave in chaves}
+        disponiveis = [
+            chave for chave, medicao in situacao.items()
+            if medicao is not None and medicao[1] is not None
+            and medicao[1] <= atraso_maximo and agora - medicao[0] <= validade
+        ]
+        return random.choice(disponiveis) if disponiveis else None
+
+    def situacao(self):
+        """Último atraso medido de cada réplica (None = inacessível)"""
+        with self._lock:
+            return {
+                chave: {'atraso_s': None if atraso is None else round(atraso, 3)}
+                for chave, (_, atraso) in self._situacao.items()
+            }
+
+
+monitor_replicas = MonitorReplicas()
+
+
+def somente_leitura(funcao):
+    """Executa a função lendo de uma réplica, quando houver.
+
+    Só desvia se a sessão ainda não abriu transação (ex.: uma rota de
+    escrita que já leu ou gravou algo continua no primário, vendo as
+    próprias alterações) e a requisição não está na janela pós-escrita.
+    """
+
+    @wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if not has_app_context() or g.get('leitura_primario'):
+            return funcao(*args, **kwargs)
+        sessao = current_app.extensions['sqlalchemy'].session()
+        if sessao.info.get(CHAVE_REPLICA) or sessao.in_transaction():
+            return funcao(*args, **kwargs)
+        chave = monitor_replicas.escolher()
+        if chave is None:
+            return funcao(*args, **kwargs)
+        sessao.info[CHAVE_REPLICA] = chave
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            sessao.info.pop(CHAVE_REPLICA, None)
+
+    return envoltorio
+
+
+def registrar_replicas(app):
+    """Roteia as leituras das requisições GET/HEAD para as réplicas.
+
+    As réplicas são as binds ``replica_*`` de SQLALCHEMY_BINDS (ver
+    DB_REPLICA_URLS em config.py). Depois de uma escrita bem-sucedida o
+    cliente recebe o cookie ``leitura_primario``: durante
+    DB_LEITURA_PRIMARIO_APOS_ESCRITA segundos as leituras dele ficam no
+    primário e já enxergam o que acabou de gravar. Deve ser registrado
+    depois de registrar_politicas_sessao.
+    """
+    db = app.extensions['sqlalchemy']
+    chaves = _chaves_replica(app.config)
+    if not chaves:
+        return
+    with app.app_context():
+        for chave in chaves:
+            _engines_replica.add(db.engines[chave])
+    janela = app.config.get('DB_LEITURA_PRIMARIO_APOS_ESCRITA', 10)
+
+    @app.before_request
+    def rotear_leitura():
+        if not g.get('sessao_somente_leitura'):
+            return
+        if request.cookies.get(COOKIE_LEITURA_PRIMARIO):
+            g.leitura_primario = True
+            return
+        chave = monitor_replicas.escolher()
+        if chave is not None:
+            db.session.info[CHAVE_REPLICA] = chave
+
+    @app.after_request
+    def marcar_escrita(response):
+        if (janela and request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            response.set_cookie(COOKIE_LEITURA_PRIMARIO, '1', max_age=janela, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from datetime import datetime
+from src.utils.email_service import email_service
+
+
+class MonitorSmtp:
+    """Verifica a conexão SMTP (connect, STARTTLS e login) em segundo plano
+    e guarda o último resultado em memória.
+
+    A verificação roda a cada SMTP_INTERVALO_VERIFICACAO segundos e logo
+    após a configuração ser salva (agendar()); o status da tela de
+    configurações é servido do resultado guardado, sem tocar no servidor
+    de email. Cada worker tem o seu monitor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_verificacao = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._resultado = None
+        self._config_verificada = None
+
+    def verificar(self, timeout):
+        """Testa a conexão agora e guarda o resultado. Verificações
+        simultâneas (thread e "verificar agora") rodam uma de cada vez."""
+        with self._lock_verificacao:
+            config = email_service.config or {}
+            inicio = time.perf_counter()
+            sucesso, mensagem = email_service.test_connection(timeout)
+            resultado = {
+                'configurado': email_service.is_configured(),
+                'conexao_ok': sucesso,
+                'mensagem': mensagem,
+                'verificado_em': datetime.utcnow().isoformat(),
+                'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2)
+            }
+            with self._lock:
+                self._resultado = resultado
+                self._config_verificada = config
+            return dict(resultado)
+
+    def situacao(self):
+        """Último resultado guardado; None se ainda não há verificação da
+        configuração atual (uma nova já foi agendada)"""
+        with self._lock:
+            resultado, config_verificada = self._resultado, self._config_verificada
+        if resultado is None or (email_service.config or {}) != config_verificada:
+            self.agendar()
+            return None
+        return dict(resultado)
+
+    def agendar(self):
+        """Pede uma verificação o quanto antes (ex.: configuração salva)"""
+        self._acordar.set()
+
+    def _executar(self, app):
+        intervalo = app.config.get('SMTP_INTERVALO_VERIFICACAO', 300)
+        timeout = app.config.get('SMTP_TIMEOUT_VERIFICACAO', 5)
+        while True:
+            self._acordar.clear()
+            try:
+                self.verificar(timeout)
+            except Exception as e:
+                print(f"Erro ao verificar SMTP: {e}")
+            self._acordar.wait(intervalo)
+
+    def iniciar(self, app):
+        """Inicia a thread de verificação deste processo, se ainda não
+        estiver rodando (após o fork de cada worker a do pai não existe)"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock_thread:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._executar, args=(app,), name='monitor-smtp', daemon=True
+            )
+            self._thread.start()
+
+
+monitor_smtp = MonitorSmtp()
+
+
+def registrar_monitor_smtp(app):
+    """Inicia o monitor SMTP de cada worker na primeira requisição"""
+
+    @app.before_request
+    def iniciar_monitor_smtp():
+        monitor_smtp.iniciar(app)
@@ -0,0 +1,53 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.utils.replicas import eh_replica
+
+METODOS_LEITURA = frozenset({'GET', 'HEAD'})
+
+# Somente leitura e DEFERRABLE: o PostgreSQL espera, se preciso, por um
+# snapshot seguro e depois executa a transação sem o custo de controle do
+# SERIALIZABLE e sem risco de falha de serialização. Todas as consultas da
+# requisição (versões da ETag, total estimado, página) veem o mesmo snapshot.
+SQL_TRANSACAO_LEITURA = 'SET TRANSACTION ISOLATION LEVEL SERIALIZABLE, READ ONLY, DEFERRABLE'
+# Réplicas (hot standby) não aceitam SERIALIZABLE; REPEATABLE READ dá o
+# mesmo snapshot único
+SQL_TRANSACAO_LEITURA_REPLICA = 'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY'
+
+
+def _apos_inicio(session, transacao, conexao):
+    if transacao.nested or not has_request_context() or conexao.dialect.name != 'postgresql':
+        return
+    comandos = []
+    if g.get('sessao_somente_leitura'):
+        comandos.append(SQL_TRANSACAO_LEITURA_REPLICA if eh_replica(conexao.engine) else SQL_TRANSACAO_LEITURA)
+    if g.get('statement_timeout'):
+        # SET LOCAL vale só para esta transação (seguro com PgBouncer)
+        comandos.append(f'SET LOCAL statement_timeout = {int(g.statement_timeout)}')
+    if comandos:
+        conexao.exec_driver_sql('; '.join(comandos))
+
+
+def registrar_politicas_sessao(app):
+    """Define a política da sessão de cada requisição pelo método HTTP.
+
+    GET/HEAD usam transação somente leitura (no PostgreSQL) e sessão sem
+    autoflush; uma escrita acidental falha em vez de ser gravada. Os demais
+    métodos usam a sessão padrão, que não expira os objetos no commit
+    (ver models/user.py). Toda transação de requisição recebe o
+    statement_timeout do blueprint (DB_STATEMENT_TIMEOUT_BLUEPRINTS) ou o
+    padrão DB_STATEMENT_TIMEOUT.
+    """
+    timeout_padrao = app.config.get('DB_STATEMENT_TIMEOUT', 0)
+    timeouts_blueprint = app.config.get('DB_STATEMENT_TIMEOUT_BLUEPRINTS', {})
+
+    if not event.contains(Session, 'after_begin', _apos_inicio):
+        event.listen(Session, 'after_begin', _apos_inicio)
+
+    @app.before_request
+    def definir_politica_sessao():
+        g.statement_timeout = timeouts_blueprint.get(request.blueprint, timeout_padrao)
+        if request.method in METODOS_LEITURA:
+            g.sessao_somente_leitura = True
+            db.session.autoflush = False
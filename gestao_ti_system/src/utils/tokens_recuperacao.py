@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import delete
+from src.models.user import db
+from src.models.token_recuperacao import TokenRecuperacao
+
+VALIDADE_TOKEN = timedelta(hours=1)
+
+
+class TokensBanco:
+    """Tokens na tabela tokens_recuperacao, compartilhada por todos os
+    nós. As operações entram na transação da sessão; quem chama faz o
+    commit."""
+
+    def criar(self, token_hash, usuario_id, validade=VALIDADE_TOKEN):
+        agora = datetime.utcnow()
+        db.session.add(TokenRecuperacao(
+            token_hash=token_hash,
+            usuario_id=usuario_id,
+            criado_em=agora,
+            expira_em=agora + validade
+        ))
+
+    def obter(self, token_hash):
+        """(usuario_id, expira_em) do token, ou None"""
+        linha = db.session.execute(
+            db.select(TokenRecuperacao.usuario_id, TokenRecuperacao.expira_em)
+            .where(TokenRecuperacao.token_hash == token_hash)
+        ).first()
+        return tuple(linha) if linha else None
+
+    def consumir(self, token_hash):
+        """Remove o token e devolve (usuario_id, expira_em), ou None se não
+        existia. Um único DELETE ... RETURNING: duas requisições com o
+        mesmo token não conseguem usá-lo ambas."""
+        linha = db.session.execute(
+            delete(TokenRecuperacao)
+            .where(TokenRecuperacao.token_hash == token_hash)
+            .returning(TokenRecuperacao.usuario_id, TokenRecuperacao.expira_em)
+        ).first()
+        return tuple(linha) if linha else None
+
+    def purgar(self):
+        """Apaga de uma vez os tokens expirados (usa o índice de expira_em)"""
+        resultado = db.session.execute(
+            delete(TokenRecuperacao).where(TokenRecuperacao.expira_em < datetime.utcnow())
+        )
+        return resultado.rowcount
+
+
+class TokensMemoria:
+    """Mesma interface de TokensBanco num dicionário do processo (testes;
+    não serve com mais de um worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+
+    def criar(self, token_hash, usuario_id, validade=VALIDADE_TOKEN):
+        with self._lock:
+            self._tokens[token_hash] = (usuario_id, datetime.utcnow() + validade)
+
+    def obter(self, token_hash):
+        with self._lock:
+            return self._tokens.get(token_hash)
+
+    def consumir(self, token_hash):
+        with self._lock:
+            return self._tokens.pop(token_hash, None)
+
+    def purgar(self):
+        agora = datetime.utcnow()
+        with self._lock:
+            expirados = [chave for chave, (_, expira_em) in self._tokens.items() if expira_em < agora]
+            for chave in expirados:
+                del self._tokens[chave]
+        return len(expirados)
+
+
+_tokens_banco = TokensBanco()
+
+
+def armazenamento_tokens():
+    """Armazenamento de tokens da aplicação atual
+    (TOKENS_RECUPERACAO_ARMAZENAMENTO: 'banco' ou 'memoria')"""
+    if current_app.config.get('TOKENS_RECUPERACAO_ARMAZENAMENTO', 'banco') != 'memoria':
+        return _tokens_banco
+    return current_app.extensions.setdefault('tokens_recuperacao', TokensMemoria())
+
+
+def registrar_limpeza_tokens(app):
+    """Registra o comando ``flask limpar-tokens-recuperacao`` (agendar no cron)"""
+
+    @app.cli.command('limpar-tokens-recuperacao')
+    def limpar_tokens_recuperacao_comando():
+        """Apaga os tokens de recuperação de senha expirados"""
+        total = armazenamento_tokens().purgar()
+        db.session.commit()
+        click.echo(f'{total} token(s) expirado(s) removido(s)')
@@ -0,0 +1,109 @@
+import hashlib
+from datetime import date
+from functools import wraps
+from flask import make_response, request
+from sqlalchemy import event, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.versao_tabela import VersaoTabela
+
+_CHAVE_TABELAS = 'tabelas_alteradas'
+
+
+def _marcar(session, tabelas):
+    tabelas = {tabela for tabela in tabelas if tabela != VersaoTabela.__tablename__}
+    if tabelas:
+        session.info.setdefault(_CHAVE_TABELAS, set()).update(tabelas)
+
+
+def _apos_flush(session, contexto_flush):
+    _marcar(session, (
+        objeto.__table__.name
+        for objeto in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(objeto, '__table__')
+    ))
+
+
+def _apos_execucao_orm(estado):
+    # INSERT/UPDATE/DELETE em lote (session.execute) não passam pelo flush
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        _marcar(estado.session, [estado.statement.table.name])
+
+
+def _incrementar(session, tabela):
+    if session.get_bind().dialect.name == 'postgresql':
+        stmt = pg_insert(VersaoTabela).values(tabela=tabela, versao=1)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[VersaoTabela.tabela],
+            set_={'versao': VersaoTabela.versao + 1}
+        ))
+        return
+    resultado = session.execute(
+        update(VersaoTabela).where(VersaoTabela.tabela == tabela).values(versao=VersaoTabela.versao + 1),
+        execution_options={'synchronize_session': False}
+    )
+    if not resultado.rowcount:
+        session.execute(insert(VersaoTabela).values(tabela=tabela, versao=1))
+
+
+def _antes_do_commit(session):
+    # Grava as alterações pendentes para saber todas as tabelas afetadas e
+    # incrementa as versões na mesma transação (em ordem, sem deadlock);
+    # a linha de versão fica bloqueada só até o COMMIT logo em seguida
+    session.flush()
+    for tabela in sorted(session.info.pop(_CHAVE_TABELAS, ())):
+        _incrementar(session, tabela)
+
+
+def _apos_rollback(session):
+    session.info.pop(_CHAVE_TABELAS, None)
+
+
+def registrar_versionamento(app):
+    """Mantém versoes_tabelas: cada commit que altera uma tabela incrementa
+    a versão dela, usada nas ETags das respostas (com_etag)"""
+    if not event.contains(Session, 'after_flush', _apos_flush):
+        event.listen(Session, 'after_flush', _apos_flush)
+        event.listen(Session, 'do_orm_execute', _apos_execucao_orm)
+        event.listen(Session, 'before_commit', _antes_do_commit)
+        event.listen(Session, 'after_rollback', _apos_rollback)
+
+
+def versoes(tabelas):
+    """Versão atual de cada tabela (0 se nunca alterada), em uma consulta"""
+    linhas = db.session.query(VersaoTabela.tabela, VersaoTabela.versao).filter(
+        VersaoTabela.tabela.in_(tabelas)
+    ).all()
+    atuais = dict(linhas)
+    return [atuais.get(tabela, 0) for tabela in tabelas]
+
+
+def com_etag(*tabelas):
+    """ETag fraca para endpoints GET que leem as ``tabelas`` informadas.
+
+    A ETag combina a URL (com filtros, fields, format...), a data atual
+    (campos como ``vencida`` dependem dela) e a versão das tabelas. Se o
+    cliente enviar If-None-Match com a mesma ETag, responde 304 sem
+    executar a consulta principal nem serializar nada.
+    """
+    def decorador(view):
+        @wraps(view)
+        def envolvida(*args, **kwargs):
+            base = f'{request.full_path}|{date.today().isoformat()}|' + ','.join(
+                f'{tabela}:{versao}' for tabela, versao in zip(tabelas, versoes(tabelas))
+            )
+            etag = hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                resposta = make_response('', 304)
+            else:
+                resposta = make_response(view(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            resposta.set_etag(etag, weak=True)
+            # Permite guardar, mas exige revalidação a cada uso
+            resposta.headers['Cache-Control'] = 'no-cache'
+            return resposta
+        return envolvida
+    return decorador